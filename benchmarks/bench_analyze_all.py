@@ -0,0 +1,79 @@
+"""Times the three-button flow against ANALYZE ALL with a downloader that takes DELAY seconds per call.
+
+- three buttons: price, indicators and forecast clicked one after another, starting from a cold
+  cache, so the later clicks reuse whatever the earlier ones fetched.
+- ANALYZE ALL: one fetch in analyze(), then the three graph callbacks in parallel off its key.
+- pre-cache baseline: the three buttons with the cache cleared before every click, which is what
+  each click cost before the price cache existed.
+"""
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import synthetic_bars
+
+import app
+from price_cache import price_cache, price_store
+
+DELAY = 0.8
+START_DATE, END_DATE, FORECAST_DAYS = "2024-01-01", "2024-12-31", "5"
+INDICATORS = ['ema:20', 'rsi:14']
+MODELS = ['ridge']
+
+
+def slow_downloader(symbol, start, end, interval="1d"):
+    time.sleep(DELAY)
+    return synthetic_bars(symbol, start, end)
+
+
+def cold():
+    price_cache.clear()
+    shutil.rmtree(price_store.root, ignore_errors=True)
+
+
+def price(symbol):
+    return app.update_graph(1, '1d', symbol, START_DATE, END_DATE)
+
+
+def indicators(symbol):
+    return app.update_ema_graph(1, INDICATORS, symbol, START_DATE, END_DATE)
+
+
+def forecast(symbol):
+    return app.get_forecast_fig(symbol, FORECAST_DAYS, END_DATE, MODELS, lambda message: None)
+
+
+def three_buttons(symbol):
+    cold()
+    for graph in (price, indicators, forecast):
+        graph(symbol)
+
+
+def pre_cache_baseline(symbol):
+    for graph in (price, indicators, forecast):
+        cold()
+        graph(symbol)
+
+
+def analyze_all(symbol):
+    cold()
+    _, job, _ = app.analyze(1, symbol, FORECAST_DAYS, START_DATE, END_DATE, MODELS, None)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(price, symbol), pool.submit(indicators, symbol),
+                   pool.submit(app.forecast_graph, lambda message: None, job)]
+        for future in futures:
+            future.result()
+
+
+def main():
+    price_store.downloader = slow_downloader
+    print(f"downloader delay {DELAY:.1f} s, {START_DATE} to {END_DATE}")
+    flows = (("three buttons", three_buttons), ("ANALYZE ALL", analyze_all), ("pre-cache baseline", pre_cache_baseline))
+    for label, flow in flows:
+        started = time.perf_counter()
+        flow("BENCH")
+        print(f"{label:18} {time.perf_counter() - started:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
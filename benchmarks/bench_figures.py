@@ -0,0 +1,36 @@
+"""Times building and serializing the price figure both ways on 1,400 daily bars.
+
+- plotly.express: px.line on a DataFrame with plotly.py validation, as app.py did before figures.py.
+- figures.py: WebGL trace dicts with typed arrays and the prebuilt template.
+
+Dash serializes callback outputs with to_json_plotly, so that is included in the timings and the size.
+"""
+import plotly.express as px
+from plotly.io.json import to_json_plotly
+
+from common import best_of, synthetic_bars
+
+import figures
+
+
+def express_figure(df):
+    fig = px.line(df, x=df.index, y=['Open', 'Close'], title="Closing and Opening Price vs Date",
+                  template=figures.STOCK_SENSE_TEMPLATE)
+    return to_json_plotly(fig)
+
+
+def dict_figure(df):
+    x = df.index.to_numpy()
+    traces = [figures.line(x, df['Open'].to_numpy(), 'Open'), figures.line(x, df['Close'].to_numpy(), 'Close')]
+    return to_json_plotly(figures.figure(traces, "Closing and Opening Price vs Date"))
+
+
+def main():
+    df = synthetic_bars(start="2019-07-01", end="2024-12-01")
+    print(f"{len(df)} daily bars, 2 traces")
+    for label, build in (("plotly.express", express_figure), ("figures.py", dict_figure)):
+        print(f"{label:15} {best_of(lambda: build(df), repeat=10):8.2f} ms {len(build(df)) / 1024:8.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
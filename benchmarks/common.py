@@ -0,0 +1,32 @@
+"""Shared setup for the benchmark scripts: offline configuration, the src path and a timer"""
+import os
+import sys
+import time
+import tempfile
+
+# Set before the app modules are imported, as they read their configuration at import time.
+_scratch = tempfile.mkdtemp(prefix="stocksense-bench-")
+for name in ("PRICE_STORE_DIR", "JOB_CACHE_DIR", "MODEL_CACHE_DIR", "LOGO_CACHE_DIR"):
+    os.environ.setdefault(name, os.path.join(_scratch, name.lower()))
+os.environ.setdefault("DATA_PROVIDERS", "synthetic")
+os.environ.setdefault("WARMUP_SYMBOLS", "")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+def best_of(func, repeat=20):
+    """Best wall time of func() over repeat runs after one warm-up call, in ms"""
+    func()
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+
+def synthetic_bars(symbol="BENCH", start="2000-01-03", end="2025-01-01"):
+    """Daily bars from the synthetic provider; the default range is about 6,500 bars"""
+    from providers import SyntheticProvider
+    return SyntheticProvider().history(symbol, start, end)
@@ -1,8 +1,7 @@
 import dash
-import requests
+import logging
 import numpy as np
 import pandas as pd
-import yfinance as yf
 import plotly.express as px
 from sklearn.svm import SVR
 from dotenv import load_dotenv
@@ -12,13 +11,25 @@ import dash_html_components as html
 from sklearn.linear_model import LinearRegression
 from dash.dependencies import Input, Output, State
 from sklearn.model_selection import train_test_split
+from price_cache import get_history
+from profile_cache import profile_cache, gather, Uncached
+from providers import MarketData, ProviderError
+from logo_cache import cache_logo, is_default_logo, register_logo_routes, DEFAULT_LOGO_URL
+from warmup import warmup
+from symbol_index import symbol_index
+from tracing import setup_logging, register_tracing, traced, stage, annotate
 
 load_dotenv()
-FMP_API = os.environ.get("FMP_API")
+setup_logging()
+log = logging.getLogger(__name__)
+# This variant reads profiles and logos from FinancialModelingPrep unless PROFILE_PROVIDERS / LOGO_PROVIDERS say otherwise.
+market_data = MarketData.from_env(profile="fmp", logo="fmp")
 app = dash.Dash(__name__)
 app.suppress_callback_exceptions = True
 
 server = app.server
+register_logo_routes(server)
+register_tracing(server)
 
 app.layout = html.Div(
     [
@@ -155,92 +166,51 @@ app.layout = html.Div(
         Output("name-id", "children"),
         Output("logo-id", "src"),
         Output("description", "children"),
+        Output("submit-error-popup", "displayed"),
+        Output("submit-error-popup", "message"),
     ],
     Input("submit-button-id", "n_clicks"),
     State("stock-input-id", "value"),
     prevent_initial_call=True
 )
 
+@traced()
 def update_data(submit_button, stock_input):
     if submit_button is None:
-        return dash.no_update
+        return (dash.no_update,) * 5
  
     if not stock_input:
-        print("No stock selected")
-        return dash.no_update
+        log.info("No stock selected")
+        return (dash.no_update,) * 5
+
+    annotate(symbol=stock_input)
+    with stage("validate"):
+        rejection = symbol_index.rejection(stock_input)
+    if rejection:
+        log.warning("Unknown stock symbol %s", stock_input, extra={'symbol': stock_input})
+        return dash.no_update, dash.no_update, dash.no_update, True, rejection
     
-    ticker = yf.Ticker(stock_input)
     try:
-        inf = ticker.info
-
-        df = pd.DataFrame().from_dict(inf, orient="index").T
-        longName = df["longName"].to_list()
-        name_string = longName[0]
-        words = name_string.split()
-        print(words)
-        first_word = words[0]
-        second_word = words[1]
-    except:
-        print("Ticker not found in yFinance")
-        print("Fetching from FMP API")
-    
-    company_logo = fetch_logo(stock_input)
-    company_desc= fetch_desc(stock_input)
-    print(company_logo)
-    print(company_desc)
-    print(company_desc[0])
-    print(company_desc[1])
-    
-    if not company_desc:
-        company_desc = ["Company Name not found", "Company Description not found"]
-    elif len(company_desc) < 2: 
-        if len(company_desc) == 0:
-            company_desc = ["Company Name not found", "Company Description not found"]
-        elif len(company_desc) == 1:
-            company_desc.append("Company Description not found")
-    
-    return company_desc[0], company_logo, company_desc[1]
-    
-    
-def fetch_desc(company_name) :
-    """Fetches the company Description using financialmodelingprep API"""
-    print(f"Desc -> Received Company name : {company_name}")
-    company = str(company_name)
-    url = f"https://financialmodelingprep.com/api/v3/profile/{company}?apikey={FMP_API}"
-    data1 = requests.get(url=url)
-    data = data1.json()
-    
-    company_details = []
-    
-    if data1.status_code == 200:
-        print("Status OKAY")
-        desc = data[0]["description"]
-        print("Description found")
-        name = data[0]['companyName']
-        desc = data[0]['description']
-        company_details.append(name)
-        company_details.append(desc)
-        return company_details
-    else:
-        print('Description not found')
-        desc = 'Description not found'
-        return desc
-    
-def fetch_logo(company_name) :
-    """Fetches the company logo using financialmodelingprep API"""
-    print(f"Image -> Received Company name : {company_name}")
-    company = str(company_name)
-    url = f"https://financialmodelingprep.com/image-stock/{company.upper()}.png?apikey={FMP_API}"
-    print(f"{url}")
-    data = requests.get(url=url)
-
-    if data.status_code == 200:
-        print("Status OKAY")
-        print("Logo found")
-        return url
-    else:
-        print('Logo not found')
-        return 'https://iili.io/dF0GdyG.png'
+        with stage("fetch"):
+            return (*profile_cache.get(stock_input, load_profile), False, '')
+    except ProviderError as e:
+        log.warning("%s", e, extra={'symbol': stock_input})
+        return dash.no_update, dash.no_update, dash.no_update, True, str(e)
+
+
+def load_profile(stock_input):
+    """Looks up the company name, logo and description, running the upstream calls concurrently"""
+    profile, company_logo = gather(
+        lambda: market_data.profile(stock_input),
+        lambda: cache_logo(market_data.logo(stock_input, stock_input) or DEFAULT_LOGO_URL),
+    )
+    if not profile['name']:
+        raise ProviderError(f"No provider knows {stock_input}")
+    log.debug("Received profile for %s", stock_input, extra={'symbol': stock_input, 'logo': company_logo})
+
+    if is_default_logo(company_logo):
+        return Uncached((profile['name'], company_logo, profile['description'] or "Company Description not found"))
+    return profile['name'], company_logo, profile['description'] or "Company Description not found"
 
 @app.callback(
     Output('stock-graph-id', 'figure'),
@@ -256,25 +226,29 @@ def fetch_logo(company_name) :
     prevent_initial_call=True
 )
 
+@traced()
 def update_graph(stock_price_button, stock_symbol, start_date, end_date):
     if stock_price_button is None:
         return dash.no_update
     
     if not stock_symbol:
-        print("No stock selected")
+        log.info("No stock selected")
         return dash.no_update
     
     if not start_date or not end_date:
-        print("Stock selected, but dates not selected")
+        log.info("Stock selected, but dates not selected")
         return dash.no_update
     
-    df = yf.download(tickers=stock_symbol, start=start_date, end=end_date)
+    annotate(symbol=stock_symbol)
+    with stage("fetch"):
+        df = get_history(stock_symbol, start_date, end_date)
     if df.empty:
-        print("No data available for this stock symbol.") 
+        log.warning("No data available for %s", stock_symbol, extra={'symbol': stock_symbol})
         return dash.no_update
     
     df.reset_index(inplace=True)
-    fig = get_stock_price_fig(df, stock_symbol)
+    with stage("figure"):
+        fig = get_stock_price_fig(df, stock_symbol)
     return fig, {'visibility': 'visible', 'width' : '80%', 'margin': '0 auto'}
 
 def get_stock_price_fig(dataFrame, stock_symbol):
@@ -311,25 +285,29 @@ def get_stock_price_fig(dataFrame, stock_symbol):
     prevent_initial_call=True
 )
 
+@traced()
 def update_ema_graph( indicator_button, stock_symbol , start_date, end_date):
     if indicator_button is None:
         return dash.no_update
     
     if not stock_symbol:
-        print("No stock selected")
+        log.info("No stock selected")
         return dash.no_update
     
     if not start_date or not end_date:
-        print("Stock selected, but dates not selected")
+        log.info("Stock selected, but dates not selected")
         return dash.no_update
     
-    df = yf.download(tickers=stock_symbol, start=start_date, end=end_date)
+    annotate(symbol=stock_symbol)
+    with stage("fetch"):
+        df = get_history(stock_symbol, start_date, end_date)
     if df.empty:
-        print("No EMA (Exponential Moving Average) available for this stock symbol.")
+        log.warning("No EMA (Exponential Moving Average) available for %s", stock_symbol, extra={'symbol': stock_symbol})
         return dash.no_update
     
     df.reset_index(inplace=True)
-    fig = get_more(df, stock_symbol)
+    with stage("figure"):
+        fig = get_more(df, stock_symbol)
     return fig, {'visibility': 'visible', 'width' : '80%', 'margin': '0 auto'}
     
 def get_more(df, stock_symbol):
@@ -367,13 +345,16 @@ def get_more(df, stock_symbol):
     prevent_initial_call=True
 )
 
+@traced()
 def forecast_graph(forecast_button, stock_symbol, forecast_days, start_date, end_date):
     if forecast_button is None:
         return dash.no_update
     
+    annotate(symbol=stock_symbol, forecast_days=forecast_days)
     START_DATE = pd.Timestamp(end_date) - pd.DateOffset(days=90)
     try :
-        df = yf.download(tickers=stock_symbol, start=START_DATE, end=end_date)
+        with stage("fetch"):
+            df = get_history(stock_symbol, START_DATE, end_date)
     except ValueError:
         return dash.no_update
     
@@ -387,11 +368,12 @@ def forecast_graph(forecast_button, stock_symbol, forecast_days, start_date, end
 
     x_train, x_test, y_train, y_test = train_test_split(X, Y, test_size=0.2, random_state=42)
 
-    svr_rbf = SVR(kernel='rbf', C=1e3, gamma=0.1)
-    svr_rbf.fit(x_train, y_train)
+    with stage("fit"):
+        svr_rbf = SVR(kernel='rbf', C=1e3, gamma=0.1)
+        svr_rbf.fit(x_train, y_train)
 
-    linear_r = LinearRegression()
-    linear_r.fit(x_train, y_train)
+        linear_r = LinearRegression()
+        linear_r.fit(x_train, y_train)
 
     x_forecast = np.array(df.drop(['Prediction'], axis=1))[-int(forecast_days):]
 
@@ -410,9 +392,9 @@ def forecast_graph(forecast_button, stock_symbol, forecast_days, start_date, end
                       yaxis_title='Price',
                       template='plotly_dark')
 
-    print("Forecast Figure Received")
-
     return fig, {'visibility': 'visible', 'width' : '80%', 'margin': '0 auto'}
 
+warmup.start(load_profile)
+
 if __name__ == '__main__':
   app.run(debug=False)
@@ -1,23 +1,36 @@
-import os
 import dash
-import requests
+import logging
+import flask
 import numpy as np
 import pandas as pd
-import yfinance as yf
-from sklearn.svm import SVR
-import plotly.express as px
 from dotenv import load_dotenv
-import plotly.graph_objs as go
 import dash_core_components as dcc
 import dash_html_components as html
-from sklearn.linear_model import LinearRegression
-from dash.dependencies import Input, Output, State
-from sklearn.model_selection import train_test_split
+from dash.dependencies import Input, Output, State, ClientsideFunction
+from price_cache import get_history
+from profile_cache import profile_cache, Uncached
+from providers import market_data, ProviderError
+from indicators import INDICATOR_OPTIONS, DEFAULT_INDICATORS, OVERLAYS
+from indicator_engine import indicator_engine
+from downsample import downsample_frame
+from resample import bar_pyramid, display_interval, INTERVAL_OPTIONS, DEFAULT_INTERVAL, INTRADAY_MINUTES
+import figures
+from jobs import background_callback_manager, claim_forecast_slot, release_forecast_slot
+from model_cache import model_cache
+from forecasting import (forecast_series, register_forecast_routes, forecast_dates as get_forecast_dates,
+                         FORECAST_MODELS, FORECAST_MODEL_OPTIONS, DEFAULT_FORECAST_MODELS)
+from logo_cache import cache_logo, is_default_logo, register_logo_routes, DEFAULT_LOGO_URL
+from warmup import warmup
+from live import quote_feed, LIVE_POLL_SECONDS
+from comparison import comparison_figures, parse_symbols, MAX_COMPARE_SYMBOLS
+from symbol_index import symbol_index
+from tracing import setup_logging, register_tracing, traced, stage, annotate
 
 load_dotenv()
-GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
+setup_logging()
+log = logging.getLogger(__name__)
 
-app = dash.Dash(__name__)
+app = dash.Dash(__name__, background_callback_manager=background_callback_manager)
 app.suppress_callback_exceptions = True
 app.title = "Stock Sense"
 app.index_string = '''
@@ -41,6 +54,17 @@ app.index_string = '''
 </html>
 '''
 server = app.server
+register_logo_routes(server)
+register_forecast_routes(server)
+register_tracing(server)
+
+@server.route("/stats/model-cache")
+def model_cache_stats():
+    return flask.jsonify(model_cache.stats())
+
+@server.route("/stats/warmup")
+def warmup_stats():
+    return flask.jsonify(warmup.stats())
 app.layout = html.Div(
     [
     html.Div([
@@ -54,11 +78,12 @@ app.layout = html.Div(
               html.Div([
                        
                         html.P("Input Stock Code :", className="stock"),
-                        dcc.Input(
+                        dcc.Dropdown(
                             id='stock-input-id',
-                            className="stock-input",
-                            type='text',
-                            value='',
+                            className="stock-dropdown",
+                            options=[],
+                            value=None,
+                            searchable=True,
                             placeholder='Example - TSLA, MSFT, AAPL',
                         ),
                         html.Div([
@@ -89,7 +114,29 @@ app.layout = html.Div(
                             id='stock-price-error-popup',
                             message=''
                         ),
+                dcc.RadioItems(
+                    id='interval-select-id',
+                    className='indicator-select',
+                    options=INTERVAL_OPTIONS,
+                    value=DEFAULT_INTERVAL,
+                    inline=True,
+                ),
+                dcc.Checklist(
+                    id='live-toggle-id',
+                    className='live-toggle',
+                    options=[{'label': 'LIVE', 'value': 'live'}],
+                    value=[],
+                    inline=True,
+                ),
+                dcc.Interval(id='live-interval-id', interval=LIVE_POLL_SECONDS * 1000, disabled=True),
                 html.Button('INDICATOR', id='indicator-button-id', className='indicator-button cursor-pointer flex items-center bg-lime-950 hover:bg-lime-900 active:border active:border-lime-400 rounded-md duration-100 p-2', n_clicks=0),
+                dcc.Checklist(
+                    id='indicator-select-id',
+                    className='indicator-select',
+                    options=INDICATOR_OPTIONS,
+                    value=DEFAULT_INDICATORS,
+                    inline=True,
+                ),
                  dcc.ConfirmDialog(
                             id='indicator-error-popup',
                             message=''
@@ -110,8 +157,45 @@ app.layout = html.Div(
                             id='forecast-error-popup',
                             message=''
                         ),
+                        dcc.Checklist(
+                            id='forecast-model-select-id',
+                            className='indicator-select',
+                            options=FORECAST_MODEL_OPTIONS,
+                            value=DEFAULT_FORECAST_MODELS,
+                            inline=True,
+                        ),
+                        html.P('', id='forecast-status-id', className="forecast-status"),
+                        html.Button('ANALYZE ALL', id='analyze-button-id', n_clicks=0, className="button forecast-button cursor-pointer flex items-center bg-lime-950 hover:bg-lime-900 active:border active:border-lime-400 rounded-md duration-100 p-2"),
+                        dcc.ConfirmDialog(
+                            id='analyze-error-popup',
+                            message=''
+                        ),
                     ], className="forecast-div"
               ),
+              html.Div([
+                       dcc.Input(
+                            id='compare-input-id',
+                            className="forecast-input",
+                            type='text',
+                            value='',
+                            placeholder='Compare - AAPL, MSFT, NVDA',
+                       ),
+                        html.Button('COMPARE', id='compare-button-id', n_clicks=0, className="button forecast-button cursor-pointer flex items-center bg-lime-950 hover:bg-lime-900 active:border active:border-lime-400 rounded-md duration-100 p-2"),
+                        dcc.ConfirmDialog(
+                            id='compare-error-popup',
+                            message=''
+                        ),
+                    ], className="forecast-div"
+              ),
+              dcc.Store(id='submit-request-id'),
+              dcc.Store(id='stock-price-request-id'),
+              dcc.Store(id='indicator-request-id'),
+              dcc.Store(id='forecast-request-id'),
+              dcc.Store(id='forecast-job-id'),
+              dcc.Store(id='analyze-request-id'),
+              dcc.Store(id='analysis-key-id'),
+              dcc.Store(id='live-cursor-id'),
+              dcc.Store(id='compare-request-id'),
     ], className="division1", id="division-1-id",
     ),
 
@@ -140,6 +224,14 @@ app.layout = html.Div(
                 dcc.Graph(id="forecast-graph-id", style={'visibility': 'hidden'})
             ], className='graph-container'),
             html.Br(),
+            html.Div([
+                dcc.Graph(id="compare-graph-id", style={'visibility': 'hidden'})
+            ], className='graph-container'),
+            html.Br(),
+            html.Div([
+                dcc.Graph(id="correlation-graph-id", style={'visibility': 'hidden'})
+            ], className='graph-container'),
+            html.Br(),
             html.Br(),
         ],
         className="division2", id="division-2-id",
@@ -148,276 +240,601 @@ app.layout = html.Div(
   className="container content"
 )
 
+# Presentation and input validation run in the browser (assets/clientside.js); only
+# valid clicks are written to the request stores that trigger the server callbacks.
+app.clientside_callback(
+    ClientsideFunction(namespace='stocksense', function_name='validate_submit'),
+    Output('submit-request-id', 'data'),
+    Output('submit-error-popup', 'displayed'),
+    Output('submit-error-popup', 'message'),
+    Input('submit-button-id', 'n_clicks'),
+    State('stock-input-id', 'value'),
+    prevent_initial_call=True
+)
+for button, request, popup in [
+    ('stock-price-button-id', 'stock-price-request-id', 'stock-price-error-popup'),
+    ('indicator-button-id', 'indicator-request-id', 'indicator-error-popup'),
+]:
+    app.clientside_callback(
+        ClientsideFunction(namespace='stocksense', function_name='validate_range'),
+        Output(request, 'data'),
+        Output(popup, 'displayed'),
+        Output(popup, 'message'),
+        Input(button, 'n_clicks'),
+        State('stock-input-id', 'value'),
+        State('date-picker-range-id', 'start_date'),
+        State('date-picker-range-id', 'end_date'),
+        prevent_initial_call=True
+    )
+app.clientside_callback(
+    ClientsideFunction(namespace='stocksense', function_name='validate_forecast'),
+    Output('forecast-request-id', 'data'),
+    Output('forecast-error-popup', 'displayed'),
+    Output('forecast-error-popup', 'message'),
+    Input('forecast-button-id', 'n_clicks'),
+    State('stock-input-id', 'value'),
+    State('forecast-input-id', 'value'),
+    State('date-picker-range-id', 'start_date'),
+    State('date-picker-range-id', 'end_date'),
+    prevent_initial_call=True
+)
+app.clientside_callback(
+    ClientsideFunction(namespace='stocksense', function_name='validate_analyze'),
+    Output('analyze-request-id', 'data'),
+    Output('analyze-error-popup', 'displayed'),
+    Output('analyze-error-popup', 'message'),
+    Input('analyze-button-id', 'n_clicks'),
+    State('stock-input-id', 'value'),
+    State('forecast-input-id', 'value'),
+    State('date-picker-range-id', 'start_date'),
+    State('date-picker-range-id', 'end_date'),
+    prevent_initial_call=True
+)
+app.clientside_callback(
+    ClientsideFunction(namespace='stocksense', function_name='validate_compare'),
+    Output('compare-request-id', 'data'),
+    Output('compare-error-popup', 'displayed'),
+    Output('compare-error-popup', 'message'),
+    Input('compare-button-id', 'n_clicks'),
+    State('compare-input-id', 'value'),
+    State('date-picker-range-id', 'start_date'),
+    State('date-picker-range-id', 'end_date'),
+    prevent_initial_call=True
+)
+app.clientside_callback(
+    ClientsideFunction(namespace='stocksense', function_name='toggle_live'),
+    Output('live-interval-id', 'disabled'),
+    Input('live-toggle-id', 'value'),
+)
+for graph in ['stock-graph-id', 'indicator-graph-id', 'forecast-graph-id', 'compare-graph-id', 'correlation-graph-id']:
+    app.clientside_callback(
+        ClientsideFunction(namespace='stocksense', function_name='show_graph'),
+        Output(graph, 'style'),
+        Input(graph, 'figure'),
+        prevent_initial_call=True
+    )
+
+@app.callback(
+    Output('stock-input-id', 'options'),
+    Input('stock-input-id', 'search_value'),
+    State('stock-input-id', 'value'),
+)
+
+# Not traced: it fires on every keystroke and is a few index lookups.
+def suggest_symbols(search_value, stock_symbol):
+    """Autocomplete from the local symbol index; the selected symbol stays in the options so it remains shown"""
+    if not search_value:
+        return dash.no_update
+    options = symbol_index.options(search_value)
+    if stock_symbol and stock_symbol not in [option['value'] for option in options]:
+        options.insert(0, {'label': stock_symbol, 'value': stock_symbol})
+    return options
+
 @app.callback(
     [
         Output("name-id", "children"),
         Output("logo-id", "src"),
         Output("description", "children"),
+        Output('submit-error-popup', 'displayed', allow_duplicate=True),
+        Output('submit-error-popup', 'message', allow_duplicate=True),
     ],
-    Input("submit-button-id", "n_clicks"),
+    Input("submit-request-id", "data"),
     State("stock-input-id", "value"),
     prevent_initial_call=True
 )
     
+@traced()
 def update_data(submit_button, stock_input):
     if submit_button is None:
-        return dash.no_update
+        return (dash.no_update,) * 5
  
     if not stock_input:
-        print("No stock selected")
-        return dash.no_update
-    
-    ticker = yf.Ticker(stock_input)
-    inf = ticker.info
-
-    df = pd.DataFrame().from_dict(inf, orient="index").T
-    print(df.to_dict())
-    print(df["longBusinessSummary"])
-
-    # Assuming df is your DataFrame
-    shortName = df["shortName"].to_list()
-    longName = df["longName"].to_list()
-
-    print(shortName)
-    print(longName)
-    name_string = longName[0] 
-    words = name_string.split()
-    print(words)  
-    # Output: ['Microsoft', 'Corporation']
-    # cleaned_names = [re.sub(r'[^a-zA-Z]', '', word) for word in words]
-    # Access each word individually
-    first_word = words[0]
-    second_word = words[1]
-
-    print(first_word)  # Output: 'Microsoft'
-    print(second_word)  # Output: 'Corporation'
-    company_logo = fetch_logo(longName[0])
+        log.info("No stock selected")
+        return (dash.no_update,) * 5
+
+    annotate(symbol=stock_input)
+    with stage("validate"):
+        rejection = symbol_index.rejection(stock_input)
+    if rejection:
+        log.warning("Unknown stock symbol %s", stock_input, extra={'symbol': stock_input})
+        return dash.no_update, dash.no_update, dash.no_update, True, rejection
     
-    # company_desc= df["longBusinessSummary"]
     try:
-        company_desc = df["longBusinessSummary"]
-    except KeyError:
-        company_desc = f'Description for {stock_input} is not available. \nPlease check the stock symbol or try again later.'
-    except Exception as e:
-        company_desc = f'An error occurred while retrieving the description for {stock_input}'
-    return longName[0], company_logo,  company_desc
-    
-    
-def fetch_logo(company_name) :
-    """Fetches the company logo using Google Knowledge Search API"""
-    print(f"Received Company name : {company_name}")
-    url = f'https://kgsearch.googleapis.com/v1/entities:search?query={company_name}&key={GOOGLE_API_KEY}&limit=1&indent=True'
-    response = requests.get(url).json()
-
-    if 'itemListElement' in response and len(response['itemListElement']) > 0:
-        if 'image' in response['itemListElement'][0]['result']:
-            logo_url = response['itemListElement'][0]['result']['image']['contentUrl']
-            print('Logo found')
-            return logo_url
-        else:
-            print('Logo not found')
-            return 'https://iili.io/dF0GdyG.png'
-    else:
-        print('Logo not found')
-        return 'https://iili.io/dF0GdyG.png'
-    
-def fetch_desc(company_name):
-    """Fetches the company logo using POLYGON.IO API"""
-    company = str(company_name)
-    print(company)
-    url = f"https://api.polygon.io/v3/reference/tickers/{company}?apiKey={GOOGLE_API_KEY}"
-    data = requests.get(url=url)
-    data = data.json()
-    # print(data)
-    if data.get('status') == "OK":
-        print("Status OKAY")
-        if 'results' in data:
-            if 'description' in data['results']:
-                desc = data['results'].get('description')
-                return str(desc)
-            else:
-                print('Description not found in results')
-        else:
-            print('Results not found in response')
-    else:
-        print('Status not OKAY')
+        with stage("fetch"):
+            return (*profile_cache.get(stock_input, load_profile), False, '')
+    except ProviderError as e:
+        log.warning("%s", e, extra={'symbol': stock_input})
+        return dash.no_update, dash.no_update, dash.no_update, True, str(e)
 
-    return 'Description Not Available'
+
+def load_profile(stock_input):
+    """Looks up the company name, logo and description for a stock symbol through the configured providers"""
+    profile = market_data.profile(stock_input)
+    if not profile['name']:
+        raise ProviderError(f"No provider knows {stock_input}")
+    log.debug("Received company name %s", profile['name'], extra={'symbol': stock_input})
+
+    company_logo = cache_logo(market_data.logo(stock_input, profile['name']) or DEFAULT_LOGO_URL)
+    company_desc = profile['description'] or f'Description for {stock_input} is not available. \nPlease check the stock symbol or try again later.'
+    # A fallback logo may stand in for a transient failure, so it is not kept for the profile TTL.
+    if is_default_logo(company_logo):
+        return Uncached((profile['name'], company_logo, company_desc))
+    return profile['name'], company_logo, company_desc
 
 
 @app.callback(
     Output('stock-graph-id', 'figure'),
-    Output('stock-graph-id', 'style'),
+    Output('live-cursor-id', 'data'),
     [
-        Input('stock-price-button-id', 'n_clicks'),
+        Input('stock-price-request-id', 'data'),
+        Input('interval-select-id', 'value'),
     ],
     [
         State("stock-input-id", "value"),
         State('date-picker-range-id', 'start_date'),
         State('date-picker-range-id', 'end_date'),
     ],
+    running=[(Output('stock-price-button-id', 'disabled'), True, False)],
     prevent_initial_call=True
 )
 
-def update_graph(stock_price_button, stock_symbol, start_date, end_date):
+@traced()
+def update_graph(stock_price_button, interval, stock_symbol, start_date, end_date):
     if stock_price_button is None:
-        return dash.no_update
+        return dash.no_update, dash.no_update
     
     if not stock_symbol:
-        print("No stock selected")
-        return dash.no_update
+        log.info("No stock selected")
+        return dash.no_update, dash.no_update
     
     if not start_date or not end_date:
-        print("Stock selected, but dates not selected")
-        return dash.no_update
+        log.info("Stock selected, but dates not selected")
+        return dash.no_update, dash.no_update
         # return {}, {'visibility' : 'hidden'}, True, 'Dates are not selected'
     
-    df = yf.download(tickers=stock_symbol, start=start_date, end=end_date)
+    interval = display_interval(interval, start_date, end_date)
+    annotate(symbol=stock_symbol, interval=interval)
+    with stage("fetch"):
+        df = bar_pyramid.get(stock_symbol, start_date, end_date, interval)
     if df.empty:
-        print("No data available for this stock symbol.") 
-        return dash.no_update
+        log.warning("No data available for %s", stock_symbol, extra={'symbol': stock_symbol})
+        return dash.no_update, dash.no_update
 
     df.reset_index(inplace=True)
-    fig = get_stock_price_fig(df, stock_symbol)
-    return fig, {'visibility': 'visible', 'width' : '80%', 'margin': '0 auto'}
-
-def get_stock_price_fig(dataFrame, stock_symbol):
-    # Line Charts
-    fig = px.line(dataFrame,
-                  x='Date',
-                  y=['Open', 'Close'],
-                  title=f"{stock_symbol} - Closing and Opening Price vs Date")
-
-    fig.update_layout(
-        template="plotly_dark",
-        paper_bgcolor='#1e1e1e',
-        font=dict(color='white'),
-        xaxis=dict(showgrid=True, gridcolor='white'),
-        yaxis=dict(showgrid=True, gridcolor='white')
-    )
-
-    return fig
+    fig = get_stock_price_fig(df, stock_symbol, interval)
+    return fig, live_cursor(stock_symbol, df, end_date)
 
-@app.callback (
+@app.callback(
+    Output('stock-graph-id', 'figure', allow_duplicate=True),
+    Output('live-cursor-id', 'data', allow_duplicate=True),
+    Input('stock-graph-id', 'relayoutData'),
     [
-        Output("indicator-graph-id", "figure"),
-        Output("indicator-graph-id", "style"),
+        State('interval-select-id', 'value'),
+        State("stock-input-id", "value"),
+        State('date-picker-range-id', 'start_date'),
+        State('date-picker-range-id', 'end_date'),
     ],
-     
+    prevent_initial_call=True
+)
+
+@traced()
+def zoom_stock_graph(relayout_data, interval, stock_symbol, start_date, end_date):
+    """Re-queries the visible window so zooming in shows full-resolution bars and zooming out coarser ones"""
+    if not relayout_data or not stock_symbol or not start_date or not end_date:
+        return dash.no_update, dash.no_update
+
+    if 'xaxis.range[0]' in relayout_data:
+        x_range = [relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]']]
+    elif 'xaxis.range' in relayout_data:
+        x_range = relayout_data['xaxis.range']
+    elif relayout_data.get('xaxis.autorange'):
+        x_range = None
+    else:
+        return dash.no_update, dash.no_update
+
+    window_start, window_end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    if x_range is not None:
+        if interval in INTRADAY_MINUTES:
+            window_start = max(window_start, pd.Timestamp(x_range[0]))
+            window_end = min(window_end, pd.Timestamp(x_range[1]))
+        else:
+            window_start = max(window_start, pd.Timestamp(x_range[0]).normalize())
+            window_end = min(window_end, pd.Timestamp(x_range[1]).normalize() + pd.Timedelta(days=1))
+        if window_start >= window_end:
+            return dash.no_update, dash.no_update
+
+    interval = display_interval(interval, window_start, window_end)
+    annotate(symbol=stock_symbol, interval=interval)
+    with stage("fetch"):
+        df = bar_pyramid.get(stock_symbol, window_start, window_end, interval)
+    if df.empty:
+        return dash.no_update, dash.no_update
+
+    df.reset_index(inplace=True)
+    fig = get_stock_price_fig(df, stock_symbol, interval)
+    if x_range is not None:
+        fig['layout']['xaxis']['range'] = x_range
+    return fig, live_cursor(stock_symbol, df, window_end)
+
+def get_stock_price_fig(dataFrame, stock_symbol, interval=DEFAULT_INTERVAL):
+    # Long ranges are downsampled so the figure never carries more than ~2 x MAX_CHART_POINTS rows
+    with stage("transform"):
+        dataFrame = downsample_frame(dataFrame, 'Date', ['Open', 'Close'])
+
+    with stage("figure"):
+        dates = dataFrame['Date'].to_numpy()
+        return figures.figure(
+            [
+                figures.line(dates, dataFrame['Open'].to_numpy(), 'Open'),
+                figures.line(dates, dataFrame['Close'].to_numpy(), 'Close'),
+                figures.live_line('Live'),
+            ],
+            f"{stock_symbol} - Closing and Opening Price vs Date ({interval} bars)",
+            uirevision=stock_symbol,
+        )
+
+# Index of the empty 'Live' trace in get_stock_price_fig that live_tick extends.
+LIVE_TRACE = 2
+# Live points kept in the browser; a full session of minute bars.
+MAX_LIVE_POINTS = 390
+
+def live_cursor(stock_symbol, df, end_date):
+    """Where live points pick up after a freshly drawn price figure: its last bar, in epoch ms.
+
+    None for a figure ending before today, so live_tick leaves historical charts alone.
+    """
+    if pd.Timestamp(end_date) < pd.Timestamp.today().normalize():
+        return None
+    last = df['Date'].iloc[-1]
+    return {'symbol': stock_symbol.strip().upper(), 'after': int(pd.Timestamp(last).value // 1_000_000)}
+
+@app.callback(
+    Output('stock-graph-id', 'extendData'),
+    Output('live-cursor-id', 'data', allow_duplicate=True),
+    Input('live-interval-id', 'n_intervals'),
+    State('live-cursor-id', 'data'),
+    prevent_initial_call=True
+)
+
+@traced()
+def live_tick(n_intervals, cursor):
+    """Appends only the bars completed since the cursor to the Live trace; the rest of the figure is untouched"""
+    if not cursor:
+        return dash.no_update, dash.no_update
+
+    annotate(symbol=cursor['symbol'])
+    with stage("fetch"):
+        bars = quote_feed.since(cursor['symbol'], cursor['after'])
+    if bars.empty:
+        return dash.no_update, dash.no_update
+
+    ms = bars.index.values.astype('datetime64[ms]').astype(np.int64)
+    update = {'x': [ms.tolist()], 'y': [bars['Close'].tolist()]}
+    return [update, [LIVE_TRACE], MAX_LIVE_POINTS], {**cursor, 'after': int(ms[-1])}
+
+@app.callback (
+    Output("indicator-graph-id", "figure"),
     [
-        Input("indicator-button-id", "n_clicks")
+        Input("indicator-request-id", "data"),
+        Input("indicator-select-id", "value"),
     ],
     [
         State("stock-input-id", "value"),
         State("date-picker-range-id", "start_date"),
         State("date-picker-range-id", "end_date"),
     ],
+    running=[(Output("indicator-button-id", "disabled"), True, False)],
     prevent_initial_call=True
 )
 
-def update_ema_graph( indicator_button, stock_symbol , start_date, end_date):
-    if indicator_button is None:
+@traced()
+def update_ema_graph( indicator_button, indicators, stock_symbol , start_date, end_date):
+    if not indicator_button:
         return dash.no_update
     
     if not stock_symbol:
-        print("No stock selected")
+        log.info("No stock selected")
         return dash.no_update
     
     if not start_date or not end_date:
-        print("Stock selected, but dates not selected")
+        log.info("Stock selected, but dates not selected")
+        return dash.no_update
+
+    if not indicators:
+        log.info("No indicators selected")
         return dash.no_update
     
-    df = yf.download(tickers=stock_symbol, start=start_date, end=end_date)
+    annotate(symbol=stock_symbol, indicators=indicators)
+    with stage("fetch"):
+        df = get_history(stock_symbol, start_date, end_date)
     if df.empty:
-        print("No EMA (Exponential Moving Average) available for this stock symbol.")
+        log.warning("No indicators available for %s", stock_symbol, extra={'symbol': stock_symbol})
         return dash.no_update
     
-    df.reset_index(inplace=True)
-    fig = get_more(df, stock_symbol)
-    return fig, {'visibility': 'visible', 'width' : '80%', 'margin': '0 auto'}
-    
-def get_more(df, stock_symbol):
-    df['EWA_20'] = df['Close'].ewm(span=20, adjust=False).mean()
-    fig = px.scatter(df,
-                     x='Date',
-                     y='EWA_20',
-                     title=f"{stock_symbol} - Exponential Moving Average (20) vs Date")
-    
-    # To show the EMA as a line plot
-    fig.update_traces(mode='lines')  
-    
-    fig.update_layout(
-        template="plotly_dark",
-        paper_bgcolor='#1e1e1e',
-        font=dict(color='white'),
-        xaxis=dict(showgrid=True, gridcolor='white'),
-        yaxis=dict(showgrid=True, gridcolor='white')
-    )
+    with stage("transform"):
+        df.reset_index(inplace=True)
+        series = indicator_engine.compute(stock_symbol, start_date, end_date, df, indicators)
+    with stage("figure"):
+        fig = get_more(df, stock_symbol, series)
     return fig
+    
+def get_more(df, stock_symbol, series):
+    """Plots price overlays (moving averages, bands, VWAP) over Close, with one row per oscillator"""
+    overlays = {name: values for name, values in series.items() if name.split('_')[0] in OVERLAYS}
+    oscillators = {}
+    for name, values in series.items():
+        if name not in overlays:
+            oscillators.setdefault(name.split('_')[0], {})[name] = values
+
+    dates = df['Date'].to_numpy()
+    traces = [figures.line(dates, df['Close'].to_numpy(), 'Close')]
+    for name, values in overlays.items():
+        traces.append(figures.line(dates, values, name))
+    for row, group in enumerate(oscillators.values(), start=2):
+        for name, values in group.items():
+            traces.append(figures.line(dates, values, name, yaxis=f'y{row}'))
+
+    return figures.figure(traces, f"{stock_symbol} - Technical Indicators vs Date", rows=1 + len(oscillators))
 
-@app.callback (
+@app.callback(
+    Output("compare-graph-id", "figure"),
+    Output("correlation-graph-id", "figure"),
     [
-        Output("forecast-graph-id", "figure"),
-        Output("forecast-graph-id", "style"),
+        Input("compare-request-id", "data"),
+        Input("indicator-select-id", "value"),
     ],
     [
-        Input("forecast-button-id", "n_clicks")
+        State("compare-input-id", "value"),
+        State("date-picker-range-id", "start_date"),
+        State("date-picker-range-id", "end_date"),
     ],
+    running=[(Output("compare-button-id", "disabled"), True, False)],
+    prevent_initial_call=True
+)
+
+@traced()
+def compare_graph(compare_button, indicators, symbols, start_date, end_date):
+    """Plots normalized returns of several tickers with the selected overlays, plus their return correlations"""
+    if not compare_button or not start_date or not end_date:
+        return dash.no_update, dash.no_update
+
+    symbols = parse_symbols(symbols)[:MAX_COMPARE_SYMBOLS]
+    if len(symbols) < 2:
+        log.info("Select at least two stocks to compare")
+        return dash.no_update, dash.no_update
+
+    annotate(symbols=len(symbols))
+    with stage("validate"):
+        unknown = [symbol for symbol in symbols if not symbol_index.known(symbol)]
+    if unknown:
+        log.warning("Unknown stock symbols %s", ', '.join(unknown), extra={'symbols': unknown})
+        return dash.no_update, dash.no_update
+
+    returns_fig, corr_fig = comparison_figures(symbols, start_date, end_date, indicators or [])
+    if returns_fig is None:
+        log.warning("No data available for %s", ', '.join(symbols))
+        return dash.no_update, dash.no_update
+    return returns_fig, corr_fig
+
+# Changing any forecast input cancels a forecast that is still running in the background.
+FORECAST_CANCEL_INPUTS = [
+    Input("stock-input-id", "value"),
+    Input("forecast-input-id", "value"),
+    Input("forecast-model-select-id", "value"),
+    Input("date-picker-range-id", "end_date"),
+]
+
+@app.callback(
+    Output("forecast-job-id", "data"),
+    Output("forecast-status-id", "children", allow_duplicate=True),
+    Input("forecast-request-id", "data"),
     [
         State("stock-input-id", "value"),
         State("forecast-input-id", "value"),
         State("date-picker-range-id", "start_date"),
         State("date-picker-range-id", "end_date"),
+        State("forecast-model-select-id", "value"),
+        State("forecast-job-id", "data"),
     ],
     prevent_initial_call=True
 )
 
-def forecast_graph(forecast_button, stock_symbol, forecast_days, start_date, end_date):
+@traced()
+def queue_forecast(forecast_button, stock_symbol, forecast_days, start_date, end_date, models, previous):
     if forecast_button is None:
-        return dash.no_update
-    
+        return dash.no_update, dash.no_update
+    return forecast_job(previous, forecast_button, stock_symbol, forecast_days, start_date, end_date, models)
+
+def forecast_job(previous, n, stock_symbol, forecast_days, start_date, end_date, models):
+    """Claims a forecast slot before any background job is submitted: (job for forecast-job-id, status line).
+
+    A new job replaces the previous one, which Dash terminates without running its
+    finally blocks, so the previous job's slot is released here first.
+    """
+    if previous:
+        release_forecast_slot(previous['slot'])
+    if not models:
+        return dash.no_update, "Select at least one forecast model."
+    slot = claim_forecast_slot()
+    if slot is None:
+        return dash.no_update, "Too many forecasts are running right now, please try again in a moment."
+    job = {
+        'n': n,
+        'symbol': stock_symbol.strip().upper(),
+        'forecast_days': forecast_days,
+        'start_date': start_date,
+        'end_date': end_date,
+        'models': models,
+        'slot': slot,
+    }
+    return job, "Queued..."
+
+@app.callback (
+    Output("forecast-graph-id", "figure"),
+    Input("forecast-job-id", "data"),
+    background=True,
+    progress=Output("forecast-status-id", "children"),
+    cancel=FORECAST_CANCEL_INPUTS,
+    running=[(Output("forecast-button-id", "disabled"), True, False)],
+    prevent_initial_call=True
+)
+
+@traced()
+def forecast_graph(set_progress, job):
+    """Runs a forecast whose slot was claimed by forecast_job; cancelled jobs are released by release_cancelled_forecast"""
+    try:
+        return get_forecast_fig(job['symbol'], job['forecast_days'], job['end_date'], job['models'], set_progress)
+    finally:
+        release_forecast_slot(job['slot'])
+
+def get_forecast_fig(stock_symbol, forecast_days, end_date, models, set_progress):
+    """Fits the selected models on the 90 days before end_date, plots their forecasts and reports their timings"""
+    annotate(symbol=stock_symbol, forecast_days=forecast_days, models=models)
+    set_progress("Fetching price history...")
     START_DATE = pd.Timestamp(end_date) - pd.DateOffset(days=90)
     try :
-        df = yf.download(tickers=stock_symbol, start=START_DATE, end=end_date)
+        with stage("fetch"):
+            df = get_history(stock_symbol, START_DATE, end_date)
     except ValueError:
+        set_progress("")
         return dash.no_update
     
-    df = df[['Adj Close']]
-
-    df['Prediction'] = df[['Adj Close']].shift(-int(forecast_days))
+    set_progress("Fitting models...")
+    try:
+        with stage("fit"):
+            results = forecast_series(df['Adj Close'].to_numpy(), forecast_days, models)
+    except ValueError as e:
+        set_progress(str(e))
+        return dash.no_update
 
-    X = np.array(df.drop(['Prediction'], axis=1))[:-int(forecast_days)]
+    forecast_dates = get_forecast_dates(end_date, forecast_days)
+
+    timings = []
+    for mode, result in results.items():
+        mae = f", walk-forward MAE {result['mae']:.2%}" if result['mae'] is not None else ""
+        timings.append(f"{FORECAST_MODELS[mode][0]}: fit {result['fit_ms']:.1f} ms, predict {result['predict_ms']:.1f} ms{mae}")
+    log.info("Forecast timings - %s", "; ".join(timings), extra={
+        'symbol': stock_symbol,
+        'models': {mode: {'fit_ms': result['fit_ms'], 'predict_ms': result['predict_ms']} for mode, result in results.items()},
+    })
+    set_progress(" | ".join(timings))
+
+    with stage("figure"):
+        fig = figures.figure(
+            [figures.line(forecast_dates, result['forecast'], f'{FORECAST_MODELS[mode][0]} Forecast') for mode, result in results.items()],
+            f'{stock_symbol} Stock Price Forecast - {forecast_days} Days',
+            xaxis={'type': 'date', 'title': {'text': 'Date'}},
+            yaxis={'title': {'text': 'Price'}},
+        )
 
-    Y = np.array(df['Prediction'])[:-int(forecast_days)]
+    return fig
 
-    x_train, x_test, y_train, y_test = train_test_split(X, Y, test_size=0.2, random_state=42)
+@app.callback(
+    Output("forecast-status-id", "children", allow_duplicate=True),
+    FORECAST_CANCEL_INPUTS,
+    State("forecast-job-id", "data"),
+    prevent_initial_call=True
+)
 
-    svr_rbf = SVR(kernel='rbf', C=1e3, gamma=0.1)
-    svr_rbf.fit(x_train, y_train)
+def release_cancelled_forecast(stock_symbol, forecast_days, models, end_date, job):
+    """Frees the slot of a job the cancel inputs just terminated; releasing a finished job's slot is a no-op"""
+    if job:
+        release_forecast_slot(job['slot'])
+    return dash.no_update
 
-    linear_r = LinearRegression()
-    linear_r.fit(x_train, y_train)
+@app.callback(
+    Output("analysis-key-id", "data"),
+    Output("forecast-job-id", "data", allow_duplicate=True),
+    Output("forecast-status-id", "children", allow_duplicate=True),
+    Input("analyze-request-id", "data"),
+    [
+        State("stock-input-id", "value"),
+        State("forecast-input-id", "value"),
+        State("date-picker-range-id", "start_date"),
+        State("date-picker-range-id", "end_date"),
+        State("forecast-model-select-id", "value"),
+        State("forecast-job-id", "data"),
+    ],
+    running=[(Output("analyze-button-id", "disabled"), True, False)],
+    prevent_initial_call=True
+)
 
-    x_forecast = np.array(df.drop(['Prediction'], axis=1))[-int(forecast_days):]
+@traced()
+def analyze(analyze_button, stock_symbol, forecast_days, start_date, end_date, models, previous):
+    """Fetches the history all three graphs need once and hands them a lightweight key.
 
-    svr_predicted = svr_rbf.predict(x_forecast)
-    lr_predicted = linear_r.predict(x_forecast)
+    The forecast job is only queued when a day count was entered and a slot is free.
+    """
+    if not analyze_button or not stock_symbol or not start_date or not end_date:
+        return dash.no_update, dash.no_update, dash.no_update
 
-    forecast_dates = pd.date_range(start=pd.to_datetime(end_date) + pd.Timedelta(days=1), periods=int(forecast_days))
+    # The forecast trains on the 90 days before end_date, which may start before start_date.
+    fetch_start = min(pd.Timestamp(start_date), pd.Timestamp(end_date) - pd.DateOffset(days=90))
+    annotate(symbol=stock_symbol)
+    with stage("fetch"):
+        df = get_history(stock_symbol, fetch_start, end_date)
+    if df.empty:
+        log.warning("No data available for %s", stock_symbol, extra={'symbol': stock_symbol})
+        return dash.no_update, dash.no_update, dash.no_update
+
+    # The bars stay server-side in the price cache (and the on-disk store shared by all
+    # workers); the graph callbacks below fire in parallel off this key and the forecast job.
+    key = {
+        'n': analyze_button,
+        'symbol': stock_symbol.strip().upper(),
+        'start_date': start_date,
+        'end_date': end_date,
+    }
+    forecast_days = (forecast_days or '').strip()
+    if not forecast_days:
+        return key, dash.no_update, dash.no_update
+    return (key, *forecast_job(previous, analyze_button, stock_symbol, forecast_days, start_date, end_date, models))
 
-    fig = go.Figure()
+@app.callback(
+    Output('stock-graph-id', 'figure', allow_duplicate=True),
+    Output('live-cursor-id', 'data', allow_duplicate=True),
+    Input('analysis-key-id', 'data'),
+    State('interval-select-id', 'value'),
+    prevent_initial_call=True
+)
 
-    fig.add_trace(go.Scatter(x=forecast_dates, y=svr_predicted, mode='lines', name='SVR Forecast'))
-    fig.add_trace(go.Scatter(x=forecast_dates, y=lr_predicted, mode='lines', name='Linear Regression Forecast'))
+@traced()
+def analyze_price(key, interval):
+    return update_graph(key['n'], interval, key['symbol'], key['start_date'], key['end_date'])
 
-    fig.update_layout(title=f'{stock_symbol} Stock Price Forecast - {forecast_days} Days',
-                      xaxis_title='Date',
-                      yaxis_title='Price',
-                      template='plotly_dark')
+@app.callback(
+    Output('indicator-graph-id', 'figure', allow_duplicate=True),
+    Input('analysis-key-id', 'data'),
+    State('indicator-select-id', 'value'),
+    prevent_initial_call=True
+)
 
-    print("Forecast Figure Received")
+@traced()
+def analyze_indicators(key, indicators):
+    return update_ema_graph(key['n'], indicators, key['symbol'], key['start_date'], key['end_date'])
 
-    return fig, {'visibility': 'visible', 'width' : '80%', 'margin': '0 auto'}
+# Every worker warms its own in-memory caches; the on-disk price store is shared, so only one downloads.
+warmup.start(load_profile)
 
 if __name__ == '__main__':
   app.run(debug=False)
\ No newline at end of file
@@ -0,0 +1,101 @@
+/* Presentation-only callbacks that run in the browser instead of on the Flask workers */
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    stocksense: {
+        /* Shows a graph once it has a figure with data */
+        show_graph: function (figure) {
+            if (!figure || !figure.data || figure.data.length === 0) {
+                return {'visibility': 'hidden'};
+            }
+            return {'visibility': 'visible', 'width': '80%', 'margin': '0 auto'};
+        },
+
+        /* Live polling only runs while the LIVE toggle is on */
+        toggle_live: function (value) {
+            return !(value && value.includes('live'));
+        },
+
+        /* Validators for each button; only valid clicks reach the server via the request stores */
+        validate_submit: function (n_clicks, symbol) {
+            return window.dash_clientside.stocksense.validate(n_clicks, 'submit', symbol);
+        },
+
+        validate_range: function (n_clicks, symbol, start_date, end_date) {
+            return window.dash_clientside.stocksense.validate(n_clicks, 'range', symbol, start_date, end_date);
+        },
+
+        validate_forecast: function (n_clicks, symbol, forecast_days, start_date, end_date) {
+            return window.dash_clientside.stocksense.validate(n_clicks, 'forecast', symbol, start_date, end_date, forecast_days);
+        },
+
+        validate_analyze: function (n_clicks, symbol, forecast_days, start_date, end_date) {
+            /* The forecast graph is optional here: only check the days field if it was filled in */
+            const kind = (forecast_days || '').trim() ? 'analyze-forecast' : 'range';
+            return window.dash_clientside.stocksense.validate(n_clicks, kind, symbol, start_date, end_date, forecast_days);
+        },
+
+        validate_compare: function (n_clicks, symbols, start_date, end_date) {
+            const no_update = window.dash_clientside.no_update;
+            if (!n_clicks) {
+                return [no_update, false, ''];
+            }
+            const tickers = (symbols || '').split(',').map(s => s.trim()).filter(s => s);
+            if (tickers.length < 2) {
+                return [no_update, true, 'Please enter at least two comma-separated stock codes to compare.'];
+            }
+            if (tickers.length > 50) {
+                return [no_update, true, 'Please compare at most 50 stock codes at a time.'];
+            }
+            for (const ticker of tickers) {
+                const problem = window.dash_clientside.stocksense.request_problem('range', ticker, start_date, end_date);
+                if (problem) {
+                    return [no_update, true, problem];
+                }
+            }
+            return [n_clicks, false, ''];
+        },
+
+        validate: function (n_clicks, kind, symbol, start_date, end_date, forecast_days) {
+            const no_update = window.dash_clientside.no_update;
+            if (!n_clicks) {
+                return [no_update, false, ''];
+            }
+            const problem = window.dash_clientside.stocksense.request_problem(kind, symbol, start_date, end_date, forecast_days);
+            if (problem) {
+                return [no_update, true, problem];
+            }
+            return [n_clicks, false, ''];
+        },
+
+        request_problem: function (kind, symbol, start_date, end_date, forecast_days) {
+            const ticker = (symbol || '').trim();
+            if (!ticker) {
+                return 'Please enter a stock code first.';
+            }
+            if (!/^[A-Za-z0-9.\-^=]{1,12}$/.test(ticker)) {
+                return `"${ticker}" is not a valid stock code.`;
+            }
+            if (kind === 'submit') {
+                return null;
+            }
+            if (kind === 'forecast' || kind === 'analyze-forecast') {
+                if (!end_date) {
+                    return 'Please pick an end date to forecast from.';
+                }
+                const days = Number((forecast_days || '').trim());
+                if (!Number.isInteger(days) || days < 1 || days > 365) {
+                    return 'Forecast days must be a whole number between 1 and 365.';
+                }
+                if (kind === 'forecast') {
+                    return null;
+                }
+            }
+            if (!start_date || !end_date) {
+                return 'Please pick both a start and an end date.';
+            }
+            if (start_date >= end_date) {
+                return 'The start date must be before the end date.';
+            }
+            return null;
+        }
+    }
+});
@@ -0,0 +1,163 @@
+"""Rolling-origin forecast backtest over the local price store.
+
+Replays forecasts at many origins for each symbol and horizon using only the
+Parquet files already in PRICE_STORE_DIR, so it runs offline, and writes one
+JSON document with error metrics and speed figures per model:
+
+    python backtest.py --symbols AAPL,MSFT --horizons 1,5,20 --workers 4 --output backtest.json
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import psutil
+import numpy as np
+import pandas as pd
+
+from price_store import PRICE_STORE_DIR, PriceStore
+from forecasting import FORECAST_MODELS, forecast_series
+
+# The dashboard trains on the 90 calendar days before end_date, about 62 trading days.
+LOOKBACK_BARS = 62
+
+
+def store_symbols(root=PRICE_STORE_DIR, interval="1d"):
+    """Lists the symbols with a Parquet file in the store"""
+    return sorted(os.path.splitext(os.path.basename(path))[0] for path in glob.glob(os.path.join(root, interval, "*.parquet")))
+
+
+def load_prices(symbol, root=PRICE_STORE_DIR, interval="1d"):
+    """Reads a symbol's Adj Close from the store without touching the network"""
+    store = PriceStore(downloader=None, root=root)
+    df = store.read(store.path(symbol, interval))
+    if df.empty or 'Adj Close' not in df:
+        return np.empty(0)
+    return df['Adj Close'].dropna().to_numpy(dtype=np.float64)
+
+
+def rss_mb():
+    """Resident memory in MB: the peak working set on Windows, the current resident set elsewhere.
+
+    psutil has no peak outside Windows, so callers sample this as they go and keep the maximum.
+    """
+    info = psutil.Process().memory_info()
+    return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+
+
+def backtest_symbol(task):
+    """Replays every origin for one (symbol, horizon) and returns one result row per model"""
+    symbol, horizon, models, root, lookback, step = task
+    values = load_prices(symbol, root)
+    origins = range(lookback, len(values) - horizon + 1, step)
+    errors = {mode: [] for mode in models}
+    timings = {mode: [0.0, 0.0] for mode in models}
+    peak = rss_mb()
+    for origin in origins:
+        results = forecast_series(values[origin - lookback:origin], horizon, models, evaluate=False, cache=False)
+        peak = max(peak, rss_mb())
+        actual = values[origin:origin + horizon]
+        for mode, result in results.items():
+            errors[mode].append((result['forecast'] - actual, actual))
+            timings[mode][0] += result['fit_ms'] / 1000
+            timings[mode][1] += result['predict_ms'] / 1000
+
+    rows = []
+    for mode in models:
+        row = {'symbol': symbol, 'horizon': horizon, 'model': mode, 'origins': len(errors[mode]),
+               'fit_seconds': timings[mode][0], 'predict_seconds': timings[mode][1]}
+        if errors[mode]:
+            error = np.concatenate([e for e, _ in errors[mode]])
+            actual = np.concatenate([a for _, a in errors[mode]])
+            row.update(mae=float(np.mean(np.abs(error))),
+                       rmse=float(np.sqrt(np.mean(error ** 2))),
+                       mape=float(np.mean(np.abs(error) / actual)))
+        rows.append(row)
+    return rows, peak
+
+
+def summarize(rows):
+    """Aggregates per-symbol rows into per-(model, horizon) metrics, weighting errors by origin count"""
+    df = pd.DataFrame([row for row in rows if row['origins']])
+    if df.empty:
+        return []
+    summary = []
+    for (mode, horizon), group in df.groupby(['model', 'horizon']):
+        weights = group['origins']
+        fit_seconds = group['fit_seconds'].sum()
+        summary.append({
+            'model': mode,
+            'horizon': int(horizon),
+            'symbols': len(group),
+            'origins': int(weights.sum()),
+            'mae': float(np.average(group['mae'], weights=weights)),
+            'rmse': float(np.sqrt(np.average(group['rmse'] ** 2, weights=weights))),
+            'mape': float(np.average(group['mape'], weights=weights)),
+            'fit_seconds': float(fit_seconds),
+            'predict_seconds': float(group['predict_seconds'].sum()),
+            'fits_per_second': float(weights.sum() / fit_seconds) if fit_seconds else None,
+        })
+    return summary
+
+
+def run(symbols, horizons, models, workers=os.cpu_count() or 1, root=PRICE_STORE_DIR, lookback=LOOKBACK_BARS, step=5):
+    """Runs the backtest over a spawn-context process pool and returns the JSON-ready report"""
+    tasks = [(symbol, horizon, models, root, lookback, step) for symbol in symbols for horizon in horizons]
+    started = time.perf_counter()
+    rows = []
+    main_peak, worker_peak = rss_mb(), 0.0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for task_rows, peak in pool.map(backtest_symbol, tasks):
+            rows.extend(task_rows)
+            main_peak, worker_peak = max(main_peak, rss_mb()), max(worker_peak, peak)
+    wall_seconds = time.perf_counter() - started
+
+    fits = sum(row['origins'] for row in rows)
+    summary = summarize(rows)
+    return {
+        'config': {'symbols': symbols, 'horizons': horizons, 'models': models, 'workers': workers,
+                   'lookback': lookback, 'step': step, 'store': root},
+        'wall_seconds': wall_seconds,
+        'fits': fits,
+        'fits_per_second': fits / wall_seconds if wall_seconds else None,
+        'peak_rss_mb': {'main': max(main_peak, rss_mb()), 'worker': worker_peak},
+        'summary': summary,
+        'results': rows,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", help="comma-separated symbols (default: every symbol in the store)")
+    parser.add_argument("--horizons", default="1,5,20", help="comma-separated forecast horizons in bars")
+    parser.add_argument("--models", default=",".join(FORECAST_MODELS), help="comma-separated forecast modes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--store", default=PRICE_STORE_DIR, help="price store directory to read from")
+    parser.add_argument("--lookback", type=int, default=LOOKBACK_BARS, help="training bars before each origin")
+    parser.add_argument("--step", type=int, default=5, help="bars between consecutive origins")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    symbols = [s.strip().upper() for s in args.symbols.split(",")] if args.symbols else store_symbols(args.store)
+    models = [m.strip() for m in args.models.split(",")]
+    unknown = [m for m in models if m not in FORECAST_MODELS]
+    if unknown:
+        parser.error(f"unknown models {unknown}, expected some of {sorted(FORECAST_MODELS)}")
+    if not symbols:
+        parser.error(f"no symbols given and none found in {args.store}")
+
+    report = run(symbols, [int(h) for h in args.horizons.split(",")], models, args.workers, args.store, args.lookback, args.step)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+def hit_stats(hits, misses, symbols=None):
+    """Sums per-symbol hit/miss Counters, optionally over a subset of symbols, into a stats dict"""
+    if symbols is not None:
+        symbols = {symbol.upper() for symbol in symbols}
+        hits = {symbol: count for symbol, count in hits.items() if symbol in symbols}
+        misses = {symbol: count for symbol, count in misses.items() if symbol in symbols}
+    counts = {"hits": sum(hits.values()), "misses": sum(misses.values())}
+    lookups = counts["hits"] + counts["misses"]
+    counts["hit_rate"] = counts["hits"] / lookups if lookups else 0.0
+    return counts
@@ -0,0 +1,147 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import figures
+from indicators import compute
+from downsample import MAX_CHART_POINTS
+from providers import market_data
+from tracing import stage
+
+MAX_COMPARE_SYMBOLS = int(os.environ.get("MAX_COMPARE_SYMBOLS", 50))
+CORRELATION_WINDOW = int(os.environ.get("CORRELATION_WINDOW", 60))
+COMPARE_CACHE_TTL = int(os.environ.get("COMPARE_CACHE_TTL", 15 * 60))
+COMPARE_CACHE_SIZE = 16
+# Points across all traces of the returns figure; 50 tickers with Bollinger Bands are 200 traces.
+COMPARE_POINT_BUDGET = int(os.environ.get("COMPARE_POINT_BUDGET", 60_000))
+# Close-based overlays that make sense on normalized prices.
+COMPARE_OVERLAYS = ('sma', 'ema', 'bbands')
+
+_aligned = OrderedDict()
+_lock = threading.Lock()
+
+
+def parse_symbols(text):
+    """Splits a comma-separated symbol list, upper-cased and de-duplicated in order"""
+    return list(dict.fromkeys(s.strip().upper() for s in (text or '').split(',') if s.strip()))
+
+
+def aligned_closes(symbols, start, end):
+    """Adj Close for every symbol on one shared date index: (dates, symbols, bars x tickers array).
+
+    All symbols come from one bulk download (a single threaded yf.download
+    call with yfinance). Dates are the union across tickers; gaps from
+    differing holidays are forward-filled, and bars before a ticker's first
+    quote stay NaN. Results are kept for COMPARE_CACHE_TTL so toggling
+    overlays does not download again.
+    """
+    key = (tuple(symbols), str(start), str(end))
+    with _lock:
+        entry = _aligned.get(key)
+        if entry is not None and time.time() - entry[0] < COMPARE_CACHE_TTL:
+            _aligned.move_to_end(key)
+            return entry[1]
+
+    frames = market_data.history_many(symbols, start, end)
+    closes = pd.DataFrame({s: frames[s]['Adj Close'] for s in symbols if s in frames and 'Adj Close' in frames[s]})
+    closes = closes.sort_index().ffill()
+    result = (closes.index.to_numpy(), list(closes.columns), closes.to_numpy(dtype=np.float64))
+
+    with _lock:
+        _aligned[key] = (time.time(), result)
+        _aligned.move_to_end(key)
+        while len(_aligned) > COMPARE_CACHE_SIZE:
+            _aligned.popitem(last=False)
+    return result
+
+
+def first_valid(prices):
+    """Row of each column's first non-NaN value (len(prices) for all-NaN columns)"""
+    valid = ~np.isnan(prices)
+    return np.where(valid.any(axis=0), valid.argmax(axis=0), len(prices))
+
+
+def normalize(prices):
+    """Cumulative return of each column since its first quote, as a fraction"""
+    start = first_valid(prices)
+    base = prices[np.minimum(start, len(prices) - 1), np.arange(prices.shape[1])]
+    return prices / base - 1
+
+
+def overlays(normalized, specs):
+    """Close-based overlays for every ticker at once: {series name: bars x tickers array}.
+
+    Leading NaNs are filled with each ticker's first value so the filters
+    seed at its first quote, then masked again, together with the warm-up
+    bars of window-based indicators.
+    """
+    start = first_valid(normalized)
+    rows = np.arange(len(normalized))[:, None]
+    filled = np.where(rows < start, normalized[np.minimum(start, len(normalized) - 1), np.arange(normalized.shape[1])], normalized)
+    series = {}
+    for spec in specs:
+        name, *params = spec.split(':')
+        if name not in COMPARE_OVERLAYS:
+            continue
+        warmup = int(params[0]) - 1 if name in ('sma', 'bbands') else 0
+        for label, values in compute({'Close': filled}, spec).items():
+            series[label] = np.where(rows < start + warmup, np.nan, values)
+    return series
+
+
+def correlation_matrix(prices, window=CORRELATION_WINDOW):
+    """Correlation of daily returns over the trailing window, as one (tickers x tickers) matrix product.
+
+    Tickers without a full window of returns get NaN rows and columns.
+    """
+    returns = np.diff(prices[-(window + 1):], axis=0) / prices[-(window + 1):-1]
+    complete = ~np.isnan(returns).any(axis=0)
+    z = returns - returns.mean(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z /= z.std(axis=0, ddof=1)
+        corr = z.T @ z / (len(returns) - 1)
+    corr[~complete, :] = np.nan
+    corr[:, ~complete] = np.nan
+    return corr
+
+
+def sample_rows(n, max_points=MAX_CHART_POINTS):
+    """Evenly spaced row indices, first and last included, shared by every ticker so x stays aligned"""
+    if n <= max_points:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, max_points).round().astype(int))
+
+
+def comparison_figures(symbols, start, end, specs):
+    """Builds the normalized-returns figure (with overlays) and the correlation heatmap"""
+    with stage("fetch"):
+        dates, tickers, prices = aligned_closes(symbols, start, end)
+    if len(tickers) == 0 or len(dates) < 2:
+        return None, None
+    with stage("transform"):
+        normalized = normalize(prices)
+        series = overlays(normalized, specs)
+        corr = correlation_matrix(prices)
+        n_traces = len(tickers) * (1 + len(series))
+        rows = sample_rows(len(dates), max(250, min(MAX_CHART_POINTS, COMPARE_POINT_BUDGET // n_traces)))
+        x = dates[rows]
+
+    with stage("figure"):
+        traces = [figures.line(x, normalized[rows, i] * 100, ticker, legendgroup=ticker) for i, ticker in enumerate(tickers)]
+        for label, values in series.items():
+            traces += [figures.line(x, values[rows, i] * 100, f'{ticker} {label}', legendgroup=ticker,
+                                    line={'dash': 'dot', 'width': 1}) for i, ticker in enumerate(tickers)]
+        returns_fig = figures.figure(traces, f"Normalized Returns (%) - {', '.join(tickers)}",
+                                     yaxis={'ticksuffix': '%'}, uirevision=','.join(tickers))
+
+        heatmap = {'type': 'heatmap', 'x': tickers, 'y': tickers,
+                   'z': np.where(np.isnan(corr), None, np.round(corr, 3)).tolist(),
+                   'zmin': -1, 'zmax': 1, 'colorscale': 'RdBu'}
+        corr_fig = figures.figure([heatmap], f"{CORRELATION_WINDOW}-Day Return Correlation ending {pd.Timestamp(dates[-1]):%Y-%m-%d}",
+                                  xaxis={'type': 'category'}, yaxis={'autorange': 'reversed'},
+                                  height=max(450, 18 * len(tickers)))
+    return returns_fig, corr_fig
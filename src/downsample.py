@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+
+MAX_CHART_POINTS = int(os.environ.get("MAX_CHART_POINTS", 1500))
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: indices of `threshold` points that keep the shape of y(x).
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    chosen point and the average of the next bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    every = (n - 2) / (threshold - 2)
+    bounds = (np.arange(threshold - 1) * every).astype(np.int64) + 1
+    bounds[-1] = n - 1
+
+    # Averages of every bucket (the last "bucket" is the final point) in one pass.
+    counts = np.diff(np.append(bounds, n))
+    avg_x = np.add.reduceat(x, bounds) / counts
+    avg_y = np.add.reduceat(y, bounds) / counts
+
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = bounds[i], bounds[i + 1]
+        xa, ya = x[a], y[a]
+        area = np.abs((xa - avg_x[i + 1]) * (y[start:end] - ya) - (xa - x[start:end]) * (avg_y[i + 1] - ya))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+
+def downsample_frame(df, x_column, y_columns, threshold=MAX_CHART_POINTS):
+    """Keeps the union of the LTTB points of each y column, so every plotted series keeps its shape"""
+    if len(df) <= threshold:
+        return df
+    x = df[x_column].to_numpy().astype("datetime64[ns]").astype(np.int64) if np.issubdtype(
+        df[x_column].dtype, np.datetime64
+    ) else df[x_column].to_numpy()
+    keep = np.unique(np.concatenate([lttb(x, df[column].to_numpy(), threshold) for column in y_columns]))
+    return df.iloc[keep]
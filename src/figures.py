@@ -0,0 +1,75 @@
+import os
+import base64
+
+import numpy as np
+
+# plotly.js >= 2.28 (bundled with dash 2.17) decodes {"dtype", "bdata"} arrays natively.
+TYPED_ARRAYS = os.environ.get("FIGURE_TYPED_ARRAYS", "1") != "0"
+
+STOCK_SENSE_TEMPLATE = {
+    'layout': {
+        'paper_bgcolor': '#1e1e1e',
+        'plot_bgcolor': '#111111',
+        'font': {'color': 'white'},
+        'colorway': ['#636efa', '#ef553b', '#00cc96', '#ab63fa', '#ffa15a',
+                     '#19d3f3', '#ff6692', '#b6e880', '#ff97ff', '#fecb52'],
+        'hovermode': 'x unified',
+        'xaxis': {'showgrid': True, 'gridcolor': 'white', 'zeroline': False},
+        'yaxis': {'showgrid': True, 'gridcolor': 'white', 'zeroline': False},
+        'legend': {'bgcolor': 'rgba(0,0,0,0)'},
+    },
+}
+
+
+def encode_array(values):
+    """Encodes a numeric array as a plotly.js typed array ({dtype, bdata}) or a plain list"""
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if not TYPED_ARRAYS:
+        return np.where(np.isnan(values), None, values).tolist()
+    return {'dtype': 'f8', 'bdata': base64.b64encode(values.tobytes()).decode('ascii')}
+
+
+def encode_dates(values):
+    """Encodes datetimes as epoch milliseconds, which plotly.js reads on a date axis"""
+    values = np.asarray(values).astype('datetime64[ms]').astype(np.int64).astype(np.float64)
+    return encode_array(values)
+
+
+def line(x, y, name, yaxis='y', **extra):
+    """Builds a WebGL line trace as a plain dict, skipping plotly.py validation"""
+    return {'type': 'scattergl', 'mode': 'lines', 'name': name,
+            'x': encode_dates(x), 'y': encode_array(y), 'yaxis': yaxis, **extra}
+
+
+def live_line(name, yaxis='y', **extra):
+    """Builds an empty WebGL line with plain-list data for extendData to append to.
+
+    plotly.js keeps typed-array specs as they were sent, and extendTraces
+    cannot append to them, so live points get their own trace.
+    """
+    return {'type': 'scattergl', 'mode': 'lines', 'name': name, 'x': [], 'y': [], 'yaxis': yaxis, **extra}
+
+
+def figure(traces, title, rows=1, **layout):
+    """Wraps traces in a figure dict using the Stock Sense template.
+
+    The template goes inline: figure dicts reach plotly.js as they are, and
+    plotly.js has no registry to look a template name up in.
+
+    With rows > 1 the y axes are stacked: the first gets 60% of the height
+    and the rest share the remainder, all over one shared date x axis.
+    """
+    fig_layout = {
+        'template': STOCK_SENSE_TEMPLATE,
+        'title': {'text': title},
+        'xaxis': {'type': 'date'},
+    }
+    if rows > 1:
+        step = 0.4 / (rows - 1)
+        fig_layout['yaxis'] = {'domain': [0.4 + 0.02, 1]}
+        fig_layout['height'] = 450 + 200 * (rows - 1)
+        for row in range(2, rows + 1):
+            top = 0.4 - step * (row - 2)
+            fig_layout[f'yaxis{row}'] = {'domain': [max(top - step + 0.02, 0), top], 'anchor': 'x'}
+    fig_layout.update(layout)
+    return {'data': traces, 'layout': fig_layout}
@@ -0,0 +1,209 @@
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import flask
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from sklearn.base import clone
+from sklearn.compose import TransformedTargetRegressor
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.linear_model import Ridge
+from sklearn.svm import LinearSVR
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.model_selection import TimeSeriesSplit
+
+from model_cache import model_cache
+from providers import market_data
+from symbol_index import symbol_index
+
+LOOKBACK_DAYS = 90
+FORECAST_LAGS = int(os.environ.get("FORECAST_LAGS", 5))
+WALK_FORWARD_SPLITS = int(os.environ.get("WALK_FORWARD_SPLITS", 3))
+MAX_BATCH_TICKERS = int(os.environ.get("MAX_BATCH_TICKERS", 500))
+FORECAST_WORKERS = int(os.environ.get("FORECAST_WORKERS", os.cpu_count() or 1))
+
+# Forecast modes, all cheap enough to fit per request on a few months of bars.
+FORECAST_MODELS = {
+    'ridge': ('Ridge', make_pipeline(StandardScaler(), Ridge(alpha=1.0, solver='cholesky'))),
+    # Returns are around 1e-2, too small for liblinear to converge on unless the targets are scaled as well.
+    'linear_svr': ('Linear SVR', TransformedTargetRegressor(
+        make_pipeline(StandardScaler(), LinearSVR(C=1.0, epsilon=0.0, dual='auto', max_iter=10000)),
+        transformer=StandardScaler())),
+    'gbm': ('Gradient Boosting', GradientBoostingRegressor(n_estimators=100, max_depth=2, learning_rate=0.05, random_state=0)),
+}
+FORECAST_MODEL_OPTIONS = [{'label': label, 'value': mode} for mode, (label, _) in FORECAST_MODELS.items()]
+DEFAULT_FORECAST_MODELS = ['ridge', 'gbm']
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def lagged_features(values, forecast_days, lags=FORECAST_LAGS):
+    """Builds the lagged feature matrix for a direct forecast_days-ahead model.
+
+    Row i is the window values[i : i + lags + 1] scaled by its last price, so
+    each feature is the return from an earlier bar to the window's end. The
+    windows come from one strided view over values, without copying them;
+    the scaling is a single vectorized pass. Targets are the return from the
+    window's end to forecast_days bars later.
+
+    Returns (X, y, X_forecast, base): X_forecast holds the last forecast_days
+    windows, whose targets fall past the end of values, and base their last
+    prices for turning predicted returns back into prices.
+    """
+    windows = sliding_window_view(values, lags + 1)
+    last = windows[:, -1:]
+    features = windows[:, :-1] / last - 1
+    n_train = len(windows) - forecast_days
+    if n_train < 2:
+        raise ValueError("Not enough price history for this forecast horizon")
+    y = values[lags + forecast_days:] / last[:n_train, 0] - 1
+    return features[:n_train], y, features[n_train:], last[n_train:, 0]
+
+
+def walk_forward_mae(estimator, X, y, forecast_days, n_splits=WALK_FORWARD_SPLITS):
+    """Mean absolute error of return forecasts over expanding-window splits, or None if X is too short.
+
+    A gap of forecast_days - 1 rows keeps training targets from overlapping
+    the bars a test fold sees. forecast_series caches the result with the
+    final model, so the folds are only fit once per training window.
+    """
+    try:
+        splits = list(TimeSeriesSplit(n_splits=n_splits, gap=forecast_days - 1).split(X))
+    except ValueError:
+        return None
+    errors = []
+    for train, test in splits:
+        model = clone(estimator).fit(X[train], y[train])
+        errors.append(np.abs(model.predict(X[test]) - y[test]))
+    return float(np.mean(np.concatenate(errors)))
+
+
+def forecast_series(adj_close, forecast_days, models=DEFAULT_FORECAST_MODELS, evaluate=True, cache=True):
+    """Forecasts the forecast_days prices after adj_close with each of the given modes.
+
+    Returns {mode: {"forecast", "fit_ms", "predict_ms", "mae"}}. Final models
+    and their walk-forward errors come from the shared model cache, so a
+    repeat window costs no fits; fit_ms includes the walk-forward fits on a
+    miss, and mae is the walk-forward error on returns (None when evaluate is off or the
+    history is too short to split). cache=False always refits, which is what
+    the backtest wants when it times fits.
+    """
+    forecast_days = int(forecast_days)
+    values = np.asarray(adj_close, dtype=np.float64)
+    X, y, X_forecast, base = lagged_features(values, forecast_days)
+
+    results = {}
+    for mode in models:
+        estimator = FORECAST_MODELS[mode][1]
+        started = time.perf_counter()
+        if cache:
+            model, mae = model_cache.get_or_fit(clone(estimator), X, y, forecast_days,
+                                                score=walk_forward_mae if evaluate else None)
+        else:
+            model, mae = clone(estimator).fit(X, y), None
+        fitted = time.perf_counter()
+        predicted = base * (1 + model.predict(X_forecast))
+        done = time.perf_counter()
+        if evaluate and not cache:
+            mae = walk_forward_mae(estimator, X, y, forecast_days)
+        results[mode] = {
+            'forecast': predicted,
+            'fit_ms': (fitted - started) * 1000,
+            'predict_ms': (done - fitted) * 1000,
+            'mae': mae,
+        }
+    return results
+
+
+def forecast_dates(end_date, forecast_days):
+    return pd.date_range(start=pd.to_datetime(end_date) + pd.Timedelta(days=1), periods=int(forecast_days))
+
+
+def download_bulk(tickers, start, end):
+    """Downloads Adj Close for many tickers, one column per ticker (a single threaded call with yfinance)"""
+    frames = market_data.history_many(list(tickers), start, end)
+    return pd.DataFrame({ticker: df['Adj Close'] for ticker, df in frames.items() if 'Adj Close' in df})
+
+
+def _forecast_one(item):
+    ticker, values, forecast_days, models = item
+    try:
+        results = forecast_series(values, forecast_days, models, evaluate=False)
+    except ValueError as e:
+        return ticker, {'error': str(e)}
+    for result in results.values():
+        result['forecast'] = result['forecast'].tolist()
+        del result['mae']
+    return ticker, results
+
+
+def _executor():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: gunicorn workers run threads, and forking a threaded process can deadlock.
+            _pool = ProcessPoolExecutor(max_workers=FORECAST_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def batch_forecast(tickers, forecast_days, end_date=None, models=DEFAULT_FORECAST_MODELS):
+    """Forecasts many tickers at once: one bulk download, model fitting fanned out over a process pool.
+
+    Returns {"end_date", "dates", "forecasts": {ticker: {mode: {"forecast", "fit_ms", "predict_ms"}} or {"error"}}}.
+    Walk-forward scoring is skipped here to keep the batch latency down. Tickers the
+    symbol index rejects get an error entry and are left out of the download.
+    """
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+    forecast_days = int(forecast_days)
+    end = pd.Timestamp(end_date) if end_date else pd.Timestamp.today().normalize()
+    known = [ticker for ticker in tickers if symbol_index.known(ticker)]
+    prices = download_bulk(known, end - pd.DateOffset(days=LOOKBACK_DAYS), end) if known else pd.DataFrame()
+
+    forecasts = {}
+    items = []
+    for ticker in tickers:
+        values = prices[ticker].dropna().to_numpy() if ticker in prices else np.empty(0)
+        if ticker not in known:
+            forecasts[ticker] = {'error': 'Unknown ticker'}
+        elif len(values) < FORECAST_LAGS + forecast_days + 3:
+            forecasts[ticker] = {'error': 'Not enough price history'}
+        else:
+            items.append((ticker, values, forecast_days, list(models)))
+
+    chunksize = max(1, len(items) // (FORECAST_WORKERS * 4))
+    forecasts.update(_executor().map(_forecast_one, items, chunksize=chunksize))
+    return {
+        'end_date': end.strftime('%Y-%m-%d'),
+        'dates': [d.strftime('%Y-%m-%d') for d in forecast_dates(end, forecast_days)],
+        'forecasts': {ticker: forecasts[ticker] for ticker in tickers},
+    }
+
+
+def register_forecast_routes(server):
+    """Adds POST /api/forecast taking {"tickers": [...], "horizon": n, "end_date": "YYYY-MM-DD"?, "models": [...]?}"""
+
+    @server.route("/api/forecast", methods=["POST"])
+    def batch_forecast_api():
+        body = flask.request.get_json(silent=True) or {}
+        tickers = body.get("tickers")
+        horizon = body.get("horizon")
+        models = body.get("models", DEFAULT_FORECAST_MODELS)
+        if not isinstance(tickers, list) or not tickers or not all(isinstance(t, str) for t in tickers):
+            return flask.jsonify(error="'tickers' must be a non-empty list of symbols"), 400
+        if len(tickers) > MAX_BATCH_TICKERS:
+            return flask.jsonify(error=f"At most {MAX_BATCH_TICKERS} tickers per request"), 400
+        if not isinstance(horizon, int) or not 1 <= horizon <= 365:
+            return flask.jsonify(error="'horizon' must be an integer between 1 and 365"), 400
+        if not isinstance(models, list) or not models or not all(m in FORECAST_MODELS for m in models):
+            return flask.jsonify(error=f"'models' must be a non-empty list of {sorted(FORECAST_MODELS)}"), 400
+        try:
+            result = batch_forecast(tickers, horizon, body.get("end_date"), models)
+        except ValueError as e:
+            return flask.jsonify(error=str(e)), 400
+        return flask.jsonify(result)
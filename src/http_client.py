@@ -0,0 +1,124 @@
+import os
+import time
+import random
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", 3.05))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", 10))
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", 2))
+HTTP_HOST_CONCURRENCY = int(os.environ.get("HTTP_HOST_CONCURRENCY", 8))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised without touching the network while a host's circuit is open"""
+
+
+class HostBusyError(requests.RequestException):
+    """Raised when a host's concurrency limit stays saturated for a whole timeout"""
+
+
+class _Circuit:
+    """Consecutive-failure circuit breaker for one host"""
+
+    def __init__(self, threshold, reset_after):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_after:
+                # Half-open: let one trial request through and re-arm the timer.
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record(self, ok):
+        with self.lock:
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class HttpClient:
+    """Shared keep-alive HTTP client for the third-party profile and logo APIs.
+
+    One pooled requests.Session reuses TLS connections across callbacks.
+    Every request gets connect/read timeouts, at most `max_retries` retries
+    with full-jitter exponential backoff on connection errors and 429/5xx
+    responses, and a per-host concurrency limit. After `failure_threshold`
+    consecutive failures a host's circuit opens and calls fail fast with
+    CircuitOpenError for `reset_after` seconds, so callers can fall back to
+    their defaults instead of pinning a worker on a dead upstream.
+    """
+
+    def __init__(self, connect_timeout=HTTP_CONNECT_TIMEOUT, read_timeout=HTTP_READ_TIMEOUT,
+                 max_retries=HTTP_MAX_RETRIES, host_concurrency=HTTP_HOST_CONCURRENCY,
+                 backoff=0.25, failure_threshold=5, reset_after=30):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.host_concurrency = host_concurrency
+        self.backoff = backoff
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=host_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        """GETs url, returning the last response or raising a requests.RequestException"""
+        host = urlsplit(url).netloc
+        semaphore, circuit = self._host(host)
+        if not circuit.allow():
+            raise CircuitOpenError(f"circuit open for {host}")
+
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+            if not semaphore.acquire(timeout=self.timeout[1]):
+                raise HostBusyError(f"too many concurrent requests to {host}")
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+                continue
+            finally:
+                semaphore.release()
+            if response.status_code not in RETRY_STATUSES:
+                circuit.record(True)
+                return response
+            error = None
+
+        circuit.record(False)
+        if error is not None:
+            raise error
+        return response
+
+    def _host(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = (
+                    threading.BoundedSemaphore(self.host_concurrency),
+                    _Circuit(self.failure_threshold, self.reset_after),
+                )
+            return self._hosts[host]
+
+
+http = HttpClient()
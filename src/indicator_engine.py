@@ -0,0 +1,165 @@
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from indicators import compute, ohlcv_arrays
+from indicator_state import IndicatorStream, checkpoint_path, load_checkpoint, save_checkpoint
+
+INDICATOR_CACHE_SIZE = 512
+# Past this many new bars one vectorized pass beats advancing the streams bar by bar.
+MAX_STREAM_BARS = 64
+# Bumped whenever the pickled stream classes change shape, so older checkpoints are ignored.
+CHECKPOINT_VERSION = 2
+log = logging.getLogger(__name__)
+
+
+class _Tail:
+    """Last computed series for a (range start, spec) plus the stream state at its final bar"""
+
+    __slots__ = ("n", "series", "stream")
+
+    def __init__(self, n, series, stream):
+        self.n = n
+        self.series = series
+        self.stream = stream
+
+
+def _timestamps(df):
+    return df['Date'].to_numpy() if 'Date' in df else df.index.to_numpy()
+
+
+class IndicatorEngine:
+    """Computes indicator sets over NumPy arrays with per-indicator memoization.
+
+    Results are cached per (symbol, range, spec), so toggling one indicator
+    in the UI only computes that indicator and reuses the rest. Each
+    indicator also keeps an IndicatorStream at its last bar; when the same
+    range start comes back with new or updated trailing bars, only those
+    bars are advanced through the stream and appended to the cached series
+    instead of recomputing from the first bar. The streams (not the series)
+    are checkpointed next to the symbol's Parquet price file by one
+    background writer, so a request never waits on the pickle and two
+    writes of the same file never race. A restored stream has no series to
+    append to, so the series is rebuilt in one vectorized pass; the stream
+    itself is kept when it already sits at the last bar.
+    """
+
+    def __init__(self, max_entries=INDICATOR_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._tails = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="indicator-checkpoint")
+
+    def compute(self, symbol, start, end, df, specs, interval="1d"):
+        """Returns {series name: ndarray} for every spec, computing only uncached ones"""
+        symbol = symbol.strip().upper()
+        last_bar = (len(df), float(df['Close'].iloc[-1])) if len(df) else (0, None)
+        results = {}
+        missing = []
+        with self._lock:
+            for spec in specs:
+                series = self._entries.get((symbol, interval, str(start), str(end), last_bar, spec))
+                if series is None:
+                    missing.append(spec)
+                else:
+                    self._entries.move_to_end((symbol, interval, str(start), str(end), last_bar, spec))
+                    results[spec] = series
+        if not missing:
+            return self._flatten(results, specs)
+
+        arrays, timestamps = ohlcv_arrays(df), _timestamps(df)
+        checkpoint = None
+        for spec in missing:
+            tail_key = (symbol, interval, str(start), spec)
+            with self._lock:
+                tail = self._tails.get(tail_key)
+            if tail is None:
+                if checkpoint is None:
+                    checkpoint = load_checkpoint(checkpoint_path(symbol, interval))
+                    if checkpoint.get('version') != CHECKPOINT_VERSION:
+                        checkpoint = {}
+                saved = checkpoint.get('streams', {}).get((str(start), spec))
+                tail = self._restore(spec, saved, arrays, timestamps) if saved else None
+
+            tail = self._extend(tail, arrays, timestamps) or self._batch(spec, arrays, timestamps)
+            results[spec] = tail.series
+            with self._lock:
+                self._put(self._entries, (symbol, interval, str(start), str(end), last_bar, spec), tail.series)
+                self._put(self._tails, tail_key, tail)
+
+        self._schedule_checkpoint(symbol, interval)
+        return self._flatten(results, specs)
+
+    def _schedule_checkpoint(self, symbol, interval):
+        with self._lock:
+            if (symbol, interval) in self._dirty:
+                return
+            self._dirty.add((symbol, interval))
+        self._writer.submit(self._write_checkpoint, symbol, interval)
+
+    def flush(self):
+        """Waits until every checkpoint scheduled so far is written"""
+        self._writer.submit(lambda: None).result()
+
+    def _write_checkpoint(self, symbol, interval):
+        """Saves {(range start, spec): (bars, stream)} for a symbol; tails are never mutated, so no copy is needed"""
+        with self._lock:
+            self._dirty.discard((symbol, interval))
+            streams = {(key[2], key[3]): (tail.n, tail.stream)
+                       for key, tail in self._tails.items() if key[:2] == (symbol, interval)}
+        try:
+            save_checkpoint(checkpoint_path(symbol, interval), {'version': CHECKPOINT_VERSION, 'streams': streams})
+        except OSError as e:
+            log.warning("Indicator checkpoint for %s could not be saved : %s", symbol, e)
+
+    def _batch(self, spec, arrays, timestamps):
+        stream = IndicatorStream(spec)
+        stream.seed(arrays, timestamps)
+        return _Tail(len(timestamps), compute(arrays, spec), stream)
+
+    def _restore(self, spec, saved, arrays, timestamps):
+        """A tail for a checkpointed (bars, stream): the series in one pass, the stream reused when it is current"""
+        n, stream = saved
+        if n != len(timestamps) or stream.last_timestamp != timestamps[-1]:
+            return None
+        return _Tail(n, compute(arrays, spec), stream)
+
+    def _extend(self, tail, arrays, timestamps):
+        """Advances a tail over the bars appended (or the last bar updated) since it was computed"""
+        if tail is None or tail.n == 0 or len(timestamps) < tail.n:
+            return None
+        if len(timestamps) - tail.n > MAX_STREAM_BARS or timestamps[tail.n - 1] != tail.stream.last_timestamp:
+            return None
+
+        # Work on a copy so a shared tail is never half-advanced.
+        stream = tail.stream.copy()
+
+        rows = []
+        for i in range(tail.n - 1, len(timestamps)):
+            rows.append(stream.advance(timestamps[i], {name: float(values[i]) for name, values in arrays.items()}))
+        series = {
+            name: np.concatenate([values[:tail.n - 1], [row[name] for row in rows]])
+            for name, values in tail.series.items()
+        }
+        return _Tail(len(timestamps), series, stream)
+
+    def _put(self, entries, key, value):
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    @staticmethod
+    def _flatten(results, specs):
+        series = {}
+        for spec in specs:
+            series.update(results[spec])
+        return series
+
+
+indicator_engine = IndicatorEngine()
@@ -0,0 +1,254 @@
+import os
+import copy
+import math
+import uuid
+import pickle
+from collections import deque
+
+import numpy as np
+
+from indicators import ewma, true_range
+from price_store import PRICE_STORE_DIR
+
+
+class EMAState:
+    """Exponential moving average advanced one value at a time"""
+
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.value = None
+
+    def seed(self, values):
+        self.value = float(ewma(values, self.alpha)[-1]) if len(values) else None
+
+    def update(self, x):
+        self.value = x if self.value is None else self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+    def snapshot(self):
+        return self.value
+
+    def restore(self, snapshot):
+        self.value = snapshot
+
+
+class RollingState:
+    """Mean and sample standard deviation over the last `span` closes, for SMA and Bollinger Bands.
+
+    The mean and sum of squared deviations are updated in O(1) as one value
+    enters and the oldest leaves the window; they are recomputed from the
+    window once every `span` bars so rounding errors never pile up.
+    """
+
+    def __init__(self, span):
+        self.span = span
+        self.window = deque()
+        self.mean = self.m2 = 0.0
+        self.since_exact = 0
+        self.evicted = None
+
+    def seed(self, values):
+        self.window.extend(float(v) for v in values[-self.span:])
+        self._exact()
+
+    def _exact(self):
+        values = np.fromiter(self.window, dtype=np.float64, count=len(self.window))
+        self.mean = float(values.mean()) if len(values) else 0.0
+        self.m2 = float(((values - self.mean) ** 2).sum()) if len(values) else 0.0
+        self.since_exact = 0
+
+    def update(self, x):
+        self.window.append(x)
+        if len(self.window) > self.span:
+            self.evicted = old = self.window.popleft()
+            old_mean = self.mean
+            self.mean += (x - old) / self.span
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        else:
+            self.evicted = None
+            delta = x - self.mean
+            self.mean += delta / len(self.window)
+            self.m2 += delta * (x - self.mean)
+        self.since_exact += 1
+        if self.since_exact >= self.span:
+            self._exact()
+        if len(self.window) < self.span:
+            return math.nan, math.nan
+        return self.mean, math.sqrt(max(self.m2, 0.0) / (self.span - 1)) if self.span > 1 else math.nan
+
+    def snapshot(self):
+        return self.mean, self.m2, self.since_exact
+
+    def restore(self, snapshot):
+        """Takes back the last update: drops its value and returns the one it pushed out"""
+        self.window.pop()
+        if self.evicted is not None:
+            self.window.appendleft(self.evicted)
+            self.evicted = None
+        self.mean, self.m2, self.since_exact = snapshot
+
+
+class IndicatorState:
+    """O(1) per-bar state for one indicator spec, matching indicators.compute"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        name, *params = spec.split(':')
+        self.name = name
+        self.params = [float(p) for p in params]
+        self.prev_close = None
+        if name == 'ema':
+            self.ema = EMAState(2 / (self.params[0] + 1))
+        elif name in ('sma', 'bbands'):
+            self.rolling = RollingState(int(self.params[0]))
+        elif name == 'rsi':
+            self.gain = EMAState(1 / self.params[0])
+            self.loss = EMAState(1 / self.params[0])
+        elif name == 'macd':
+            fast, slow, signal = self.params
+            self.fast, self.slow, self.signal = EMAState(2 / (fast + 1)), EMAState(2 / (slow + 1)), EMAState(2 / (signal + 1))
+        elif name == 'atr':
+            self.ema = EMAState(1 / self.params[0])
+        elif name == 'obv':
+            self.total = 0.0
+        elif name == 'vwap':
+            self.cum_pv = self.cum_v = 0.0
+        else:
+            raise ValueError(f'Unknown indicator: {spec}')
+
+    def seed(self, arrays):
+        """Initialises the state from historical OHLCV arrays in one vectorized pass"""
+        close = arrays['Close']
+        if len(close) == 0:
+            return
+        name = self.name
+        if name == 'ema':
+            self.ema.seed(close)
+        elif name in ('sma', 'bbands'):
+            self.rolling.seed(close)
+        elif name == 'rsi' and len(close) > 1:
+            delta = np.diff(close)
+            self.gain.seed(np.clip(delta, 0, None))
+            self.loss.seed(np.clip(-delta, 0, None))
+        elif name == 'macd':
+            self.fast.seed(close)
+            self.slow.seed(close)
+            self.signal.seed(ewma(close, self.fast.alpha) - ewma(close, self.slow.alpha))
+        elif name == 'atr':
+            self.ema.seed(true_range(arrays['High'], arrays['Low'], close))
+        elif name == 'obv':
+            self.total = float(np.sum(np.sign(np.diff(close)) * arrays['Volume'][1:]))
+        elif name == 'vwap':
+            self.cum_pv = float(np.sum((arrays['High'] + arrays['Low'] + close) / 3 * arrays['Volume']))
+            self.cum_v = float(np.sum(arrays['Volume']))
+        self.prev_close = float(close[-1])
+
+    def _parts(self):
+        return [part for part in (getattr(self, attr, None) for attr in ('ema', 'rolling', 'gain', 'loss', 'fast', 'slow', 'signal'))
+                if part is not None]
+
+    def snapshot(self):
+        """The scalars update() changes, for taking back the last bar without copying the state"""
+        return (self.prev_close, getattr(self, 'total', None), getattr(self, 'cum_pv', None), getattr(self, 'cum_v', None),
+                [part.snapshot() for part in self._parts()])
+
+    def restore(self, snapshot):
+        self.prev_close, total, cum_pv, cum_v, parts = snapshot
+        if self.name == 'obv':
+            self.total = total
+        elif self.name == 'vwap':
+            self.cum_pv, self.cum_v = cum_pv, cum_v
+        for part, part_snapshot in zip(self._parts(), parts):
+            part.restore(part_snapshot)
+
+    def update(self, bar):
+        """Advances by one bar ({'High', 'Low', 'Close', 'Volume'}) and returns {series name: value}"""
+        close = bar['Close']
+        prev_close, self.prev_close = self.prev_close, close
+        name, params = self.name, self.params
+
+        if name == 'ema':
+            return {f'EMA_{int(params[0])}': self.ema.update(close)}
+        if name == 'sma':
+            return {f'SMA_{int(params[0])}': self.rolling.update(close)[0]}
+        if name == 'bbands':
+            mid, std = self.rolling.update(close)
+            return {'BB_Upper': mid + params[1] * std, 'BB_Middle': mid, 'BB_Lower': mid - params[1] * std}
+        if name == 'rsi':
+            if prev_close is None:
+                return {f'RSI_{int(params[0])}': math.nan}
+            delta = close - prev_close
+            gain, loss = self.gain.update(max(delta, 0.0)), self.loss.update(max(-delta, 0.0))
+            return {f'RSI_{int(params[0])}': 100.0 if loss == 0 else 100 - 100 / (1 + gain / loss)}
+        if name == 'macd':
+            macd = self.fast.update(close) - self.slow.update(close)
+            signal = self.signal.update(macd)
+            return {'MACD': macd, 'MACD_Signal': signal, 'MACD_Hist': macd - signal}
+        if name == 'atr':
+            prev = close if prev_close is None else prev_close
+            tr = max(bar['High'] - bar['Low'], abs(bar['High'] - prev), abs(bar['Low'] - prev))
+            return {f'ATR_{int(params[0])}': self.ema.update(tr)}
+        if name == 'obv':
+            if prev_close is not None:
+                self.total += np.sign(close - prev_close) * bar['Volume']
+            return {'OBV': self.total}
+        if name == 'vwap':
+            self.cum_pv += (bar['High'] + bar['Low'] + close) / 3 * bar['Volume']
+            self.cum_v += bar['Volume']
+            return {'VWAP': self.cum_pv / self.cum_v if self.cum_v else math.nan}
+
+
+class IndicatorStream:
+    """Streaming indicator state for one series of bars.
+
+    `advance` applies one bar in O(1), updating the state in place. A bar
+    with the same timestamp as the last one replaces it (today's bar keeps
+    moving until the close), which is why the scalars from just before the
+    last bar are kept as a snapshot.
+    """
+
+    def __init__(self, spec):
+        self.state = IndicatorState(spec)
+        self.last_timestamp = None
+        self._before_last = None
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+    def seed(self, arrays, timestamps):
+        """Seeds from history, keeping the last bar replaceable"""
+        if len(timestamps) == 0:
+            return
+        self.state.seed({name: values[:-1] for name, values in arrays.items()})
+        self.advance(timestamps[-1], {name: float(values[-1]) for name, values in arrays.items()})
+
+    def advance(self, timestamp, bar):
+        """Applies one bar and returns {series name: value}, or None for a bar older than the last"""
+        if self.last_timestamp is not None and timestamp < self.last_timestamp:
+            return None
+        if timestamp == self.last_timestamp:
+            self.state.restore(self._before_last)
+        self._before_last = self.state.snapshot()
+        self.last_timestamp = timestamp
+        return self.state.update(bar)
+
+
+def checkpoint_path(symbol, interval="1d", root=PRICE_STORE_DIR):
+    """Path of the indicator checkpoint kept next to a symbol's Parquet price file"""
+    return os.path.join(root, interval, f"{symbol.strip().upper()}.indicators.pkl")
+
+
+def save_checkpoint(path, checkpoint):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return {}
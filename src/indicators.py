@@ -0,0 +1,114 @@
+import numpy as np
+from scipy.signal import lfilter
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Spec strings are "<name>[:<param>...]", e.g. "ema:20", "macd:12:26:9", "bbands:20:2".
+INDICATOR_OPTIONS = [
+    {'label': 'SMA 20', 'value': 'sma:20'},
+    {'label': 'SMA 50', 'value': 'sma:50'},
+    {'label': 'SMA 200', 'value': 'sma:200'},
+    {'label': 'EMA 20', 'value': 'ema:20'},
+    {'label': 'EMA 50', 'value': 'ema:50'},
+    {'label': 'Bollinger Bands', 'value': 'bbands:20:2'},
+    {'label': 'VWAP', 'value': 'vwap'},
+    {'label': 'RSI 14', 'value': 'rsi:14'},
+    {'label': 'MACD', 'value': 'macd:12:26:9'},
+    {'label': 'ATR 14', 'value': 'atr:14'},
+    {'label': 'OBV', 'value': 'obv'},
+]
+DEFAULT_INDICATORS = ['ema:20']
+# Series name prefixes drawn on the price axis; everything else is an oscillator with its own scale.
+OVERLAYS = {'SMA', 'EMA', 'BB', 'VWAP'}
+
+
+def ewma(values, alpha):
+    """Exponentially weighted mean seeded with the first value (pandas ewm(adjust=False)).
+
+    Works along axis 0, so a 2-D (bars x tickers) array is filtered per column in one call.
+    """
+    if len(values) == 0:
+        return values.astype(float)
+    zi = (1 - alpha) * values[:1]
+    return lfilter([alpha], [1, alpha - 1], values, axis=0, zi=zi)[0]
+
+
+def sma(values, span):
+    out = np.full(values.shape, np.nan)
+    if len(values) >= span:
+        csum = np.cumsum(np.concatenate([np.zeros_like(values[:1], dtype=float), values]), axis=0)
+        out[span - 1:] = (csum[span:] - csum[:-span]) / span
+    return out
+
+
+def rolling_std(values, span):
+    out = np.full(values.shape, np.nan)
+    if len(values) >= span:
+        out[span - 1:] = sliding_window_view(values, span, axis=0).std(axis=-1, ddof=1)
+    return out
+
+
+def rsi(close, span):
+    out = np.full(len(close), np.nan)
+    if len(close) < 2:
+        return out
+    delta = np.diff(close)
+    gain = ewma(np.clip(delta, 0, None), 1 / span)
+    loss = ewma(np.clip(-delta, 0, None), 1 / span)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[1:] = np.where(loss == 0, 100.0, 100 - 100 / (1 + gain / loss))
+    return out
+
+
+def true_range(high, low, close):
+    prev_close = np.concatenate([close[:1], close[:-1]])
+    return np.maximum.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+
+
+def obv(close, volume):
+    return np.cumsum(np.sign(np.diff(close, prepend=close[:1])) * volume)
+
+
+def vwap(high, low, close, volume):
+    typical = (high + low + close) / 3
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.cumsum(typical * volume) / np.cumsum(volume)
+
+
+def compute(arrays, spec):
+    """Computes one indicator spec from OHLCV arrays, returning {series name: ndarray}"""
+    name, *params = spec.split(':')
+    params = [float(p) for p in params]
+    close = arrays['Close']
+
+    if name == 'sma':
+        return {f'SMA_{int(params[0])}': sma(close, int(params[0]))}
+    if name == 'ema':
+        return {f'EMA_{int(params[0])}': ewma(close, 2 / (params[0] + 1))}
+    if name == 'bbands':
+        span, width = int(params[0]), params[1]
+        mid = sma(close, span)
+        band = width * rolling_std(close, span)
+        return {'BB_Upper': mid + band, 'BB_Middle': mid, 'BB_Lower': mid - band}
+    if name == 'vwap':
+        return {'VWAP': vwap(arrays['High'], arrays['Low'], close, arrays['Volume'])}
+    if name == 'rsi':
+        return {f'RSI_{int(params[0])}': rsi(close, int(params[0]))}
+    if name == 'macd':
+        fast, slow, signal = params
+        macd = ewma(close, 2 / (fast + 1)) - ewma(close, 2 / (slow + 1))
+        signal_line = ewma(macd, 2 / (signal + 1))
+        return {'MACD': macd, 'MACD_Signal': signal_line, 'MACD_Hist': macd - signal_line}
+    if name == 'atr':
+        return {f'ATR_{int(params[0])}': ewma(true_range(arrays['High'], arrays['Low'], close), 1 / params[0])}
+    if name == 'obv':
+        return {'OBV': obv(close, arrays['Volume'])}
+    raise ValueError(f'Unknown indicator: {spec}')
+
+
+def ohlcv_arrays(df):
+    """Pulls the OHLCV columns out of a bar frame once as float64 arrays"""
+    return {
+        column: df[column].to_numpy(dtype=np.float64)
+        for column in ('Open', 'High', 'Low', 'Close', 'Volume')
+        if column in df
+    }
@@ -0,0 +1,45 @@
+import os
+import time
+import uuid
+
+import diskcache
+from dash import DiskcacheManager
+
+JOB_CACHE_DIR = os.environ.get(
+    "JOB_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "jobs")
+)
+MAX_FORECAST_JOBS = int(os.environ.get("MAX_FORECAST_JOBS", max(os.cpu_count() or 1, 2)))
+FORECAST_JOB_TIMEOUT = int(os.environ.get("FORECAST_JOB_TIMEOUT", 5 * 60))
+_SLOTS_KEY = "forecast-slots"
+
+job_cache = diskcache.Cache(JOB_CACHE_DIR)
+# Background callbacks run in local processes coordinated through this on-disk cache,
+# so no external broker is needed and every gunicorn worker sees the same jobs.
+background_callback_manager = DiskcacheManager(job_cache)
+
+
+def claim_forecast_slot():
+    """Claims one of MAX_FORECAST_JOBS slots shared by all workers, returning its id, or None when all are busy.
+
+    Slots are claimed before a forecast job is submitted and released by
+    the job when it ends, so a burst of forecasts pushes back on the user
+    instead of starting processes that would only give up. Slots expire
+    after FORECAST_JOB_TIMEOUT, so a job that is cancelled or dies without
+    releasing its slot does not leak it for good.
+    """
+    slot = uuid.uuid4().hex
+    with job_cache.transact():
+        now = time.time()
+        slots = {job: deadline for job, deadline in job_cache.get(_SLOTS_KEY, {}).items() if deadline > now}
+        acquired = len(slots) < MAX_FORECAST_JOBS
+        if acquired:
+            slots[slot] = now + FORECAST_JOB_TIMEOUT
+        job_cache.set(_SLOTS_KEY, slots)
+    return slot if acquired else None
+
+
+def release_forecast_slot(slot):
+    with job_cache.transact():
+        slots = job_cache.get(_SLOTS_KEY, {})
+        slots.pop(slot, None)
+        job_cache.set(_SLOTS_KEY, slots)
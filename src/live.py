@@ -0,0 +1,62 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from jobs import job_cache
+from providers import market_data
+
+LIVE_POLL_SECONDS = int(os.environ.get("LIVE_POLL_SECONDS", 15))
+LIVE_INTERVAL = "1m"
+
+
+class QuoteFeed:
+    """Latest minute bars per symbol, polled upstream at most once per `period` seconds.
+
+    The bars live in the diskcache shared by every worker, and a lease key
+    that only one caller can add per period decides who polls. However many
+    sessions watch a symbol, across however many workers, there is one
+    upstream request per symbol per period; everyone else reads the cached
+    frame. Each poll covers the last two days only, so a tick costs the same
+    however long the chart's history is.
+    """
+
+    def __init__(self, cache=job_cache, period=LIVE_POLL_SECONDS, source=market_data.history):
+        self.cache = cache
+        self.period = period
+        self.source = source
+
+    def bars(self, symbol):
+        """The cached recent bars for symbol, polling first if they are older than period"""
+        symbol = symbol.strip().upper()
+        cached = self.cache.get(f"live:{symbol}")
+        if cached is None or time.time() - cached[0] >= self.period:
+            # add() only succeeds for one caller until the lease expires.
+            if self.cache.add(f"live-lease:{symbol}", os.getpid(), expire=self.period):
+                cached = (time.time(), self._poll(symbol))
+                self.cache.set(f"live:{symbol}", cached, expire=self.period * 20)
+        return cached[1] if cached is not None else pd.DataFrame()
+
+    def since(self, symbol, after_ms):
+        """Completed bars strictly after after_ms (epoch ms, naive exchange time).
+
+        The newest bar is still forming, so it is held back until the next one starts.
+        """
+        df = self.bars(symbol)
+        if len(df) < 2:
+            return df.iloc[:0]
+        ms = df.index.values.astype('datetime64[ms]').astype(np.int64)
+        return df.iloc[np.searchsorted(ms, after_ms, side='right'):-1]
+
+    def _poll(self, symbol):
+        now = pd.Timestamp.now().normalize()
+        df = self.source(symbol, now - pd.Timedelta(days=1), now + pd.Timedelta(days=2), LIVE_INTERVAL)
+        if df is None or df.empty:
+            return pd.DataFrame()
+        if getattr(df.index, "tz", None) is not None:
+            df = df.tz_localize(None)
+        return df[['Close']].sort_index()
+
+
+quote_feed = QuoteFeed()
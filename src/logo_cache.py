@@ -0,0 +1,138 @@
+import os
+import io
+import uuid
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import requests
+from flask import abort, send_file
+from PIL import Image, features
+
+from http_client import http
+
+LOGO_CACHE_DIR = os.environ.get(
+    "LOGO_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "logos")
+)
+LOGO_SIZE = int(os.environ.get("LOGO_SIZE", 128))
+LOGO_ROUTE = "/logos/"
+LOGO_URL_CACHE_SIZE = int(os.environ.get("LOGO_URL_CACHE_SIZE", 4096))
+DEFAULT_LOGO_URL = 'https://iili.io/dF0GdyG.png'
+
+_FORMAT, _EXT, _MIMETYPE = ("WEBP", "webp", "image/webp") if features.check("webp") else ("PNG", "png", "image/png")
+# The default logo is stored under a fixed name, so it survives restarts without a download.
+_DEFAULT_NAME = f"default.{_EXT}"
+_local_urls = OrderedDict()
+_lock = threading.Lock()
+log = logging.getLogger(__name__)
+
+
+def cache_logo(remote_url):
+    """Downloads, downscales and stores a remote logo once, returning its local /logos/ URL.
+
+    Files are named by the hash of their encoded bytes, so a URL never changes
+    content and can be served as immutable. Falls back to default_logo() if
+    the image cannot be fetched, decoded or stored, never to the remote URL,
+    which may carry a provider's API key. URLs that are already local (such
+    as /assets/ paths from the local provider) are returned as is.
+    """
+    if not remote_url.startswith(("http://", "https://")):
+        return remote_url
+    if remote_url == DEFAULT_LOGO_URL:
+        return default_logo()
+
+    with _lock:
+        if remote_url in _local_urls:
+            _local_urls.move_to_end(remote_url)
+            return _local_urls[remote_url]
+
+    try:
+        data = _encode(_download(remote_url))
+        name = f"{hashlib.sha256(data).hexdigest()[:32]}.{_EXT}"
+        _store(name, data)
+    except (requests.RequestException, OSError, ValueError):
+        # Query strings are left out of the log as well: they hold the API key for fmp and polygon.
+        log.warning("Logo could not be cached : %s", remote_url.split("?", 1)[0])
+        return default_logo()
+
+    local_url = LOGO_ROUTE + name
+    with _lock:
+        _local_urls[remote_url] = local_url
+        while len(_local_urls) > LOGO_URL_CACHE_SIZE:
+            _local_urls.popitem(last=False)
+    return local_url
+
+
+def cache_default_logo():
+    """Stores the default logo locally unless it already is; called once at startup"""
+    if os.path.exists(os.path.join(LOGO_CACHE_DIR, _DEFAULT_NAME)):
+        return
+    try:
+        _store(_DEFAULT_NAME, _encode(_download(DEFAULT_LOGO_URL)))
+    except (requests.RequestException, OSError, ValueError) as e:
+        log.warning("Default logo could not be cached : %s", type(e).__name__)
+
+
+def default_logo():
+    """The local URL of the default logo, or its remote URL until cache_default_logo() has stored it"""
+    if os.path.exists(os.path.join(LOGO_CACHE_DIR, _DEFAULT_NAME)):
+        return LOGO_ROUTE + _DEFAULT_NAME
+    return DEFAULT_LOGO_URL
+
+
+def is_default_logo(url):
+    """Whether url is the default logo, local or remote"""
+    return url in (DEFAULT_LOGO_URL, LOGO_ROUTE + _DEFAULT_NAME)
+
+
+def _download(url):
+    response = http.get(url)
+    response.raise_for_status()
+    return response.content
+
+
+def _store(name, data):
+    path = os.path.join(LOGO_CACHE_DIR, name)
+    if os.path.exists(path):
+        return
+    os.makedirs(LOGO_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _encode(content):
+    image = Image.open(io.BytesIO(content))
+    image.thumbnail((LOGO_SIZE, LOGO_SIZE))
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+    out = io.BytesIO()
+    if _FORMAT == "WEBP":
+        image.save(out, format=_FORMAT, quality=85, method=6)
+    else:
+        image.save(out, format=_FORMAT, optimize=True)
+    return out.getvalue()
+
+
+def register_logo_routes(server):
+    """Adds the /logos/<name> route serving cached logos with strong, long-lived caching headers,
+    and stores the default logo in the background so fallbacks are served locally too"""
+    threading.Thread(target=cache_default_logo, name="default-logo", daemon=True).start()
+
+    @server.route(LOGO_ROUTE + "<name>")
+    def serve_logo(name):
+        path = os.path.join(LOGO_CACHE_DIR, os.path.basename(name))
+        if not os.path.isfile(path):
+            abort(404)
+        response = send_file(
+            path,
+            mimetype=_MIMETYPE,
+            etag=os.path.splitext(name)[0],
+            conditional=True,
+            max_age=365 * 24 * 60 * 60,
+        )
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
@@ -0,0 +1,160 @@
+import os
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import joblib
+import diskcache
+import numpy as np
+
+MODEL_CACHE_DIR = os.environ.get(
+    "MODEL_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "models")
+)
+MODEL_CACHE_SIZE = int(os.environ.get("MODEL_CACHE_SIZE", 64))
+# Caps on the joblib files on disk, shared by every process using the directory.
+MODEL_CACHE_MAX_BYTES = int(os.environ.get("MODEL_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+MODEL_CACHE_MAX_AGE = int(os.environ.get("MODEL_CACHE_MAX_AGE", 7 * 24 * 60 * 60))
+log = logging.getLogger(__name__)
+
+
+def fingerprint(estimator, X, y, horizon):
+    """Hashes the training window, the horizon and the estimator's class and hyperparameters"""
+    digest = hashlib.sha256()
+    for array in (X, y):
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    params = sorted((k, repr(v)) for k, v in estimator.get_params().items())
+    digest.update(repr((type(estimator).__name__, int(horizon), params)).encode())
+    return digest.hexdigest()
+
+
+class ModelCache:
+    """Fitted-model cache: an in-memory LRU in front of joblib files on disk.
+
+    Models are keyed by `fingerprint`, so a repeat forecast on the same
+    training window, horizon and hyperparameters skips fitting entirely,
+    along with scoring it: each entry keeps the model's score next to it.
+    Forecasts run in background processes, so hit/miss counters live in a
+    small diskcache next to the model files where every process can
+    increment them atomically. A disk hit touches its file, and every new
+    file prunes the directory: files older than `max_age` seconds go first,
+    then the least recently used until the total is under `max_bytes`.
+    """
+
+    def __init__(self, directory=MODEL_CACHE_DIR, max_entries=MODEL_CACHE_SIZE,
+                 max_bytes=MODEL_CACHE_MAX_BYTES, max_age=MODEL_CACHE_MAX_AGE):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = diskcache.Cache(os.path.join(directory, "stats"))
+
+    def get_or_fit(self, estimator, X, y, horizon, score=None):
+        """Returns (model, scored): a fitted copy of estimator for (X, y) and score(estimator, X, y, horizon).
+
+        Both are computed only on a miss and are stored together; scored is
+        None without a score function. An entry cached without a score gets
+        one the first time it is asked for, so it costs no refit.
+        """
+        key = fingerprint(estimator, X, y, horizon)
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                self._models.move_to_end(key)
+        path = os.path.join(self.directory, f"{key}.joblib")
+        if entry is not None:
+            self._counters.incr("hits")
+        else:
+            entry = self._load(path)
+            if entry is not None:
+                self._counters.incr("disk_hits")
+            else:
+                entry = (estimator.fit(X, y), None)
+                self._counters.incr("misses")
+                if score is None:
+                    self._save(entry, path)
+
+        model, scored = entry
+        if score is not None and scored is None:
+            scored = score(estimator, X, y, horizon)
+            entry = (model, scored)
+            self._save(entry, path)
+
+        with self._lock:
+            self._models[key] = entry
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_entries:
+                self._models.popitem(last=False)
+        return entry
+
+    def _load(self, path):
+        """The (model, score) stored at path, or None if there is none; a file that cannot be unpickled is removed"""
+        try:
+            entry = joblib.load(path)
+            model, _ = entry
+            os.utime(path)
+            return entry
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # Truncated writes and files from other library versions fail in many ways; refit either way.
+            log.warning("Removing unreadable model file %s : %s: %s", path, type(e).__name__, e)
+            self._remove(path)
+            return None
+
+    def _save(self, entry, path):
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            joblib.dump(entry, tmp_path)
+            os.replace(tmp_path, path)
+            self.prune()
+        except OSError as e:
+            log.warning("Model could not be saved to %s : %s", path, e)
+
+    def prune(self):
+        """Removes expired model files, then the least recently used ones while the directory is over max_bytes"""
+        now = time.time()
+        files = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith((".joblib", ".tmp")):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            # Temp files are only left behind by a crashed writer; give a live one an hour to finish.
+            max_age = 60 * 60 if entry.name.endswith(".tmp") else self.max_age
+            if now - stat.st_mtime > max_age:
+                self._remove(entry.path)
+            elif entry.name.endswith(".joblib"):
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def stats(self):
+        """Returns hit/miss counts across all processes using this cache directory"""
+        counts = {name: self._counters.get(name, 0) for name in ("hits", "disk_hits", "misses")}
+        lookups = sum(counts.values())
+        counts["hit_rate"] = (counts["hits"] + counts["disk_hits"]) / lookups if lookups else 0.0
+        return counts
+
+
+model_cache = ModelCache()
@@ -0,0 +1,136 @@
+import os
+import time
+import threading
+from collections import OrderedDict, Counter
+
+import pandas as pd
+
+from singleflight import SingleFlight
+from cache_stats import hit_stats
+from providers import market_data
+from price_store import (PriceStore, missing_ranges, merge_ranges, merge_frames, valid_ranges, refreshed_at,
+                         download, fill_once)
+
+PRICE_CACHE_MAX_BYTES = int(os.environ.get("PRICE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+PRICE_CACHE_TTL = int(os.environ.get("PRICE_CACHE_TTL", 15 * 60))
+
+
+class _Entry:
+    __slots__ = ("df", "ranges", "fetched_at", "nbytes")
+
+    def __init__(self, df, ranges, fetched_at):
+        self.df = df
+        self.ranges = ranges
+        self.fetched_at = fetched_at
+        self.nbytes = int(df.memory_usage(deep=True).sum())
+
+
+class PriceCache:
+    """In-memory OHLCV cache keyed by (symbol, interval).
+
+    Each key holds one sorted frame plus the [start, end) ranges it is known
+    to cover. A request is answered by slicing that frame; only the parts of
+    the requested range that are not yet covered are downloaded and merged
+    in. Bars from the day the entry was last fetched onwards are still
+    moving, so once the entry is older than `ttl` seconds that tail is
+    treated as missing again. Entries are evicted least recently used first
+    once the cache grows past `max_bytes`. Concurrent misses on the same key
+    share one fill instead of each downloading the same gaps.
+    """
+
+    def __init__(self, downloader=market_data.history, max_bytes=PRICE_CACHE_MAX_BYTES, ttl=PRICE_CACHE_TTL):
+        self.downloader = downloader
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._hits = Counter()
+        self._misses = Counter()
+
+    def get(self, symbol, start, end, interval="1d", track=True):
+        """Returns bars for symbol in [start, end), downloading only the missing gaps.
+
+        track=False keeps the lookup out of the hit/miss counts (used by the warm-up).
+        """
+        key = (symbol.strip().upper(), interval)
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            hit = entry is not None and not missing_ranges(self._valid_ranges(entry), start, end)
+            if track:
+                (self._hits if hit else self._misses)[key[0]] += 1
+            if hit:
+                self._entries.move_to_end(key)
+                return self._slice(entry.df, start, end)
+
+        entry = fill_once(self._flight, key, self._fill, key, start, end)
+        if entry is None:
+            return pd.DataFrame()
+        with self._lock:
+            return self._slice(entry.df, start, end)
+
+    def _fill(self, key, start, end):
+        with self._lock:
+            entry = self._entries.get(key)
+            gaps = missing_ranges(self._valid_ranges(entry), start, end)
+            if entry is not None and not gaps:
+                return entry
+
+        fetched = [download(self.downloader, key[0], gap_start, gap_end, key[1]) for gap_start, gap_end in gaps]
+        if all(frame.empty for frame in fetched) and (entry is None or entry.df.empty):
+            return None
+
+        with self._lock:
+            return self._merge(key, gaps, fetched)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def entry(self, symbol, interval="1d"):
+        """The current cache entry for (symbol, interval), or None; replaced, never mutated, on every fill"""
+        with self._lock:
+            return self._entries.get((symbol.strip().upper(), interval))
+
+    def stats(self, symbols=None):
+        """Returns hit/miss counts, over all symbols or only the given ones"""
+        with self._lock:
+            return hit_stats(self._hits, self._misses, symbols)
+
+    def _valid_ranges(self, entry):
+        return [] if entry is None else valid_ranges(entry.ranges, entry.fetched_at, self.ttl)
+
+    def _merge(self, key, gaps, fetched):
+        old = self._entries.pop(key, None)
+        if old is None:
+            entry = _Entry(merge_frames(fetched), merge_ranges(gaps), time.time())
+        else:
+            self._nbytes -= old.nbytes
+            ranges = merge_ranges(self._valid_ranges(old) + gaps)
+            entry = _Entry(merge_frames([old.df] + fetched), ranges, refreshed_at(old.fetched_at, gaps, time.time()))
+
+        self._entries[key] = entry
+        self._nbytes += entry.nbytes
+        while self._nbytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._nbytes -= evicted.nbytes
+        return entry
+
+    @staticmethod
+    def _slice(df, start, end):
+        if df.empty:
+            return df.copy()
+        return df[(df.index >= start) & (df.index < end)].copy()
+
+
+price_store = PriceStore(market_data.history)
+price_cache = PriceCache(downloader=price_store.fetch)
+
+
+def get_history(symbol, start, end, interval="1d", track=True):
+    """Returns OHLCV bars for symbol in [start, end) through the shared cache"""
+    return price_cache.get(symbol, start, end, interval, track)
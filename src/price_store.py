@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from singleflight import SingleFlight
+
+PRICE_STORE_DIR = os.environ.get(
+    "PRICE_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "prices")
+)
+PRICE_STORE_TTL = int(os.environ.get("PRICE_STORE_TTL", 15 * 60))
+ROW_GROUP_SIZE = 1024
+META_KEY = b"stocksense"
+
+
+def missing_ranges(ranges, start, end):
+    """Returns the parts of [start, end) not covered by the sorted, disjoint ranges"""
+    gaps = []
+    cursor = start
+    for range_start, range_end in ranges:
+        if range_end <= cursor:
+            continue
+        if range_start >= end:
+            break
+        if range_start > cursor:
+            gaps.append((cursor, range_start))
+        cursor = range_end
+        if cursor >= end:
+            break
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def merge_ranges(ranges):
+    """Coalesces overlapping or touching [start, end) ranges into a sorted list"""
+    merged = []
+    for range_start, range_end in sorted(ranges):
+        if merged and range_start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+        else:
+            merged.append((range_start, range_end))
+    return merged
+
+
+def settled_day(fetched_at):
+    """Midnight of the day bars were fetched on; bars from then on were still moving at the time"""
+    return pd.Timestamp(fetched_at, unit="s").normalize()
+
+
+def valid_ranges(ranges, fetched_at, ttl):
+    """The ranges that can still be trusted: all of them within ttl of the fetch, else only the settled part"""
+    if fetched_at is None or time.time() - fetched_at < ttl:
+        return ranges
+    settled = settled_day(fetched_at)
+    return [(s, min(e, settled)) for s, e in ranges if s < settled]
+
+
+def refreshed_at(fetched_at, gaps, now):
+    """The fetch time to keep after filling gaps: now if any gap reached the unsettled tail, else the old one"""
+    if fetched_at is None or any(e > settled_day(fetched_at) for _, e in gaps):
+        return now
+    return fetched_at
+
+
+def download(downloader, symbol, start, end, interval):
+    """Calls downloader for [start, end), returning tz-naive bars or an empty frame"""
+    df = downloader(symbol, start, end, interval)
+    if df is None or df.empty:
+        return pd.DataFrame()
+    if getattr(df.index, "tz", None) is not None:
+        df = df.tz_localize(None)
+    return df
+
+
+def fill_once(flight, key, fill, *args):
+    """Runs fill through flight until this caller's own call has run.
+
+    Followers of a shared fill go round again: the leader may have filled a
+    different range, and the next round usually finds nothing missing.
+    """
+    while True:
+        result, shared = flight.do(key, fill, *args)
+        if not shared:
+            return result
+
+
+def merge_frames(frames):
+    """Concatenates bar frames into one sorted frame, later frames winning on duplicate timestamps"""
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames)
+    return df[~df.index.duplicated(keep="last")].sort_index()
+
+
+class PriceStore:
+    """On-disk Parquet store with one file per symbol under <root>/<interval>/.
+
+    Files carry the [start, end) ranges they cover and the time they were last
+    fetched in their schema metadata, so the store can act as a persistent
+    gap-filling layer between the in-memory PriceCache and the downloader.
+    Files are opened through memory mapping, which lets every gunicorn worker
+    share the OS page cache, and date-range reads only decode the row groups
+    whose index statistics overlap the requested range. Concurrent fills of
+    the same file are coalesced within the process and serialised across
+    workers through a lock file.
+    """
+
+    def __init__(self, downloader, root=PRICE_STORE_DIR, ttl=PRICE_STORE_TTL):
+        self.downloader = downloader
+        self.root = root
+        self.ttl = ttl
+        self._flight = SingleFlight(lock_dir=os.path.join(root, ".locks"))
+
+    def path(self, symbol, interval):
+        return os.path.join(self.root, interval, f"{symbol.upper()}.parquet")
+
+    def covers(self, symbol, interval, start, end):
+        """Whether the file has ever held [start, end), stale tail included"""
+        ranges, _ = self._read_meta(self.path(symbol, interval))
+        return not missing_ranges(ranges, pd.Timestamp(start), pd.Timestamp(end))
+
+    def fetch(self, symbol, start, end, interval="1d"):
+        """Returns bars in [start, end), downloading and persisting only what the file lacks"""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        path = self.path(symbol, interval)
+        ranges, _ = self._coverage(path)
+        if not missing_ranges(ranges, start, end):
+            return self.read(path, start, end)
+
+        return fill_once(self._flight, (symbol.upper(), interval), self._fill, path, symbol, start, end, interval)
+
+    def _fill(self, path, symbol, start, end, interval):
+        ranges, fetched_at = self._coverage(path)
+        gaps = missing_ranges(ranges, start, end)
+        if not gaps:
+            return self.read(path, start, end)
+
+        fetched = [download(self.downloader, symbol, gap_start, gap_end, interval) for gap_start, gap_end in gaps]
+        if all(frame.empty for frame in fetched) and not ranges:
+            return pd.DataFrame()
+
+        stored = self.read(path) if ranges else pd.DataFrame()
+        df = merge_frames([stored] + fetched)
+        self._write(path, df, merge_ranges(ranges + gaps), refreshed_at(fetched_at, gaps, time.time()))
+        return df[(df.index >= start) & (df.index < end)]
+
+    def read(self, path, start=None, end=None):
+        """Reads the row groups of path overlapping [start, end) via a memory map"""
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        with pa.memory_map(path, "r") as source:
+            parquet_file = pq.ParquetFile(source)
+            if start is None:
+                table = parquet_file.read()
+            else:
+                table = parquet_file.read_row_groups(self._row_groups(parquet_file, start, end))
+        df = table.to_pandas()
+        if start is not None:
+            df = df[(df.index >= start) & (df.index < end)]
+        return df
+
+    def _row_groups(self, parquet_file, start, end):
+        metadata = parquet_file.metadata
+        column = parquet_file.schema_arrow.get_field_index(
+            json.loads(parquet_file.schema_arrow.metadata[b"pandas"])["index_columns"][0]
+        )
+        groups = []
+        for i in range(metadata.num_row_groups):
+            stats = metadata.row_group(i).column(column).statistics
+            if stats is None or not stats.has_min_max:
+                groups.append(i)
+            elif pd.Timestamp(stats.max) >= start and pd.Timestamp(stats.min) < end:
+                groups.append(i)
+        return groups
+
+    def _coverage(self, path):
+        ranges, fetched_at = self._read_meta(path)
+        return valid_ranges(ranges, fetched_at, self.ttl), fetched_at
+
+    def _read_meta(self, path):
+        if not os.path.exists(path):
+            return [], None
+        metadata = pq.read_schema(path, memory_map=True).metadata or {}
+        if META_KEY not in metadata:
+            return [], None
+        meta = json.loads(metadata[META_KEY])
+        ranges = [(pd.Timestamp(s), pd.Timestamp(e)) for s, e in meta["ranges"]]
+        return ranges, meta["fetched_at"]
+
+    def _write(self, path, df, ranges, fetched_at):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        meta = {
+            "ranges": [[s.isoformat(), e.isoformat()] for s, e in ranges],
+            "fetched_at": fetched_at,
+        }
+        table = table.replace_schema_metadata({**table.schema.metadata, META_KEY: json.dumps(meta).encode()})
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE)
+        os.replace(tmp_path, path)
@@ -0,0 +1,80 @@
+import os
+import time
+import threading
+from collections import OrderedDict, Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from singleflight import SingleFlight
+from cache_stats import hit_stats
+
+PROFILE_TTL = int(os.environ.get("PROFILE_TTL", 7 * 24 * 60 * 60))
+PROFILE_CACHE_SIZE = int(os.environ.get("PROFILE_CACHE_SIZE", 2048))
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="profile")
+
+
+def gather(*calls):
+    """Runs independent zero-argument calls concurrently and returns their results in order"""
+    futures = [_executor.submit(call) for call in calls]
+    return [future.result() for future in futures]
+
+
+class Uncached:
+    """Wraps a loader result that should be returned but not cached, such as a profile showing a fallback logo"""
+
+    def __init__(self, value):
+        self.value = value
+
+
+class ProfileCache:
+    """Long-TTL cache of company profiles (name, logo, description) keyed by symbol.
+
+    Profiles hardly ever change, so a SUBMIT for a symbol seen within `ttl`
+    seconds is answered without any upstream call. Concurrent misses for the
+    same symbol share one load, and only successful loads are cached: a
+    loader raising, or returning its result wrapped in Uncached, leaves the
+    symbol to be loaded again next time.
+    """
+
+    def __init__(self, ttl=PROFILE_TTL, max_entries=PROFILE_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._hits = Counter()
+        self._misses = Counter()
+
+    def get(self, symbol, loader, track=True):
+        """Returns the cached profile for symbol, calling loader(symbol) on a miss"""
+        key = symbol.strip().upper()
+        with self._lock:
+            entry = self._entries.get(key)
+            hit = entry is not None and time.time() - entry[0] < self.ttl
+            if track:
+                (self._hits if hit else self._misses)[key] += 1
+            if hit:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        profile, _ = self._flight.do(key, self._load, key, symbol, loader)
+        return profile
+
+    def _load(self, key, symbol, loader):
+        profile = loader(symbol)
+        if isinstance(profile, Uncached):
+            return profile.value
+        with self._lock:
+            self._entries[key] = (time.time(), profile)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return profile
+
+    def stats(self, symbols=None):
+        """Returns hit/miss counts, over all symbols or only the given ones"""
+        with self._lock:
+            return hit_stats(self._hits, self._misses, symbols)
+
+
+profile_cache = ProfileCache()
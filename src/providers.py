@@ -0,0 +1,383 @@
+import os
+import re
+import json
+import zlib
+import logging
+
+import numpy as np
+import pandas as pd
+import requests
+import yfinance as yf
+from dotenv import load_dotenv
+
+from http_client import http
+
+# API keys and provider chains are read at import, before app.py gets to its own load_dotenv().
+load_dotenv()
+LOCAL_DATA_DIR = os.environ.get(
+    "LOCAL_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "local")
+)
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+log = logging.getLogger(__name__)
+# requests puts the full URL, apikey included, into its error messages
+QUERY_STRING = re.compile(r"\?[^\s'\")]*")
+
+
+def redact(error):
+    """The error message with URL query strings (and the API keys in them) removed, for logging"""
+    return QUERY_STRING.sub("", str(error))
+
+
+class ProviderError(Exception):
+    """Raised when a provider cannot answer, so the next provider in the chain is tried"""
+
+
+class Provider:
+    """One market-data source. Every method may raise ProviderError or requests.RequestException.
+
+    history returns OHLCV bars in [start, end) with OHLCV_COLUMNS, profile a
+    {"name", "description"} dict (either may be missing) and logo an image
+    URL or None. Sources that lack a kind of data keep the defaults here.
+    """
+
+    name = None
+
+    def history(self, symbol, start, end, interval="1d"):
+        raise ProviderError(f"{self.name} has no price history")
+
+    def history_many(self, symbols, start, end, interval="1d"):
+        """Returns {symbol: bars} for the symbols this provider has, one request each by default"""
+        frames = {}
+        for symbol in symbols:
+            try:
+                df = self.history(symbol, start, end, interval)
+            except (ProviderError, requests.RequestException):
+                continue
+            if not df.empty:
+                frames[symbol] = df
+        return frames
+
+    def profile(self, symbol):
+        return None
+
+    def logo(self, symbol, company_name):
+        return None
+
+
+class YFinanceProvider(Provider):
+    name = "yfinance"
+    # Yahoo serves at most 7 days of 1m bars per request.
+    MAX_REQUEST_DAYS = {"1m": 7}
+
+    def history(self, symbol, start, end, interval="1d"):
+        if interval in self.MAX_REQUEST_DAYS:
+            step = pd.Timedelta(days=self.MAX_REQUEST_DAYS[interval])
+            start, end = pd.Timestamp(start), pd.Timestamp(end)
+            chunks = [self._download(symbol, s, min(s + step, end), interval) for s in pd.date_range(start, end, freq=step, inclusive='left')]
+            chunks = [chunk for chunk in chunks if not chunk.empty]
+            return pd.concat(chunks) if chunks else pd.DataFrame()
+        return self._download(symbol, start, end, interval)
+
+    @staticmethod
+    def _download(symbol, start, end, interval):
+        df = yf.download(tickers=symbol, start=start, end=end, interval=interval, progress=False)
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.get_level_values(0)
+        # Intraday frames come back indexed as 'Datetime'.
+        df.index.name = 'Date'
+        return df
+
+    def history_many(self, symbols, start, end, interval="1d"):
+        """Downloads every symbol in one threaded yf.download call"""
+        df = yf.download(tickers=list(symbols), start=start, end=end, interval=interval,
+                         group_by='ticker', threads=True, progress=False)
+        if df.empty:
+            return {}
+        if not isinstance(df.columns, pd.MultiIndex):
+            return {symbols[0]: df}
+        frames = {}
+        for symbol in df.columns.get_level_values(0).unique():
+            frame = df[symbol].dropna(how='all')
+            if not frame.empty:
+                frames[symbol] = frame
+        return frames
+
+    def profile(self, symbol):
+        info = yf.Ticker(symbol).info
+        if not info.get("longName"):
+            raise ProviderError(f"yfinance does not know {symbol}")
+        return {'name': info["longName"], 'description': info.get("longBusinessSummary")}
+
+
+class FMPProvider(Provider):
+    """financialmodelingprep.com, keyed by FMP_API"""
+
+    name = "fmp"
+    BASE_URL = "https://financialmodelingprep.com"
+
+    def __init__(self, api_key=None):
+        self.api_key = api_key or os.environ.get("FMP_API")
+
+    def history(self, symbol, start, end, interval="1d"):
+        if interval != "1d":
+            raise ProviderError("fmp history is daily only")
+        last_day = pd.Timestamp(end) - pd.Timedelta(days=1)
+        url = (f"{self.BASE_URL}/api/v3/historical-price-full/{symbol.upper()}"
+               f"?from={pd.Timestamp(start):%Y-%m-%d}&to={last_day:%Y-%m-%d}&apikey={self.api_key}")
+        bars = http.get(url).json().get('historical') or []
+        if not bars:
+            return pd.DataFrame()
+        df = pd.DataFrame(bars).rename(columns={'date': 'Date', 'open': 'Open', 'high': 'High', 'low': 'Low',
+                                                'close': 'Close', 'adjClose': 'Adj Close', 'volume': 'Volume'})
+        return df.set_index(pd.to_datetime(df['Date'])).sort_index()[OHLCV_COLUMNS]
+
+    def profile(self, symbol):
+        response = http.get(f"{self.BASE_URL}/api/v3/profile/{symbol.upper()}?apikey={self.api_key}")
+        data = response.json() if response.status_code == 200 else None
+        if not data:
+            raise ProviderError(f"fmp has no profile for {symbol}")
+        return {'name': data[0].get('companyName'), 'description': data[0].get('description')}
+
+    def logo(self, symbol, company_name):
+        # Not probed here: cache_logo downloads it once and falls back to the default logo on a miss.
+        return f"{self.BASE_URL}/image-stock/{symbol.upper()}.png?apikey={self.api_key}"
+
+
+class PolygonProvider(Provider):
+    """polygon.io, keyed by POLYGON_API_KEY"""
+
+    name = "polygon"
+    BASE_URL = "https://api.polygon.io"
+    TIMESPANS = {"1m": (1, "minute"), "5m": (5, "minute"), "15m": (15, "minute"), "1h": (1, "hour"), "1d": (1, "day")}
+
+    def __init__(self, api_key=None):
+        self.api_key = api_key or os.environ.get("POLYGON_API_KEY")
+
+    def history(self, symbol, start, end, interval="1d"):
+        if interval not in self.TIMESPANS:
+            raise ProviderError(f"polygon has no {interval} bars")
+        multiplier, timespan = self.TIMESPANS[interval]
+        start_ms = int(pd.Timestamp(start).timestamp() * 1000)
+        end_ms = int(pd.Timestamp(end).timestamp() * 1000) - 1
+        url = (f"{self.BASE_URL}/v2/aggs/ticker/{symbol.upper()}/range/{multiplier}/{timespan}/{start_ms}/{end_ms}"
+               f"?adjusted=true&sort=asc&limit=50000&apiKey={self.api_key}")
+        bars = http.get(url).json().get('results') or []
+        if not bars:
+            return pd.DataFrame()
+        df = pd.DataFrame(bars)
+        # Aggregates are split-adjusted already, so Close doubles as Adj Close.
+        df = pd.DataFrame({'Open': df['o'], 'High': df['h'], 'Low': df['l'], 'Close': df['c'],
+                           'Adj Close': df['c'], 'Volume': df['v']}).set_index(pd.to_datetime(df['t'], unit='ms'))
+        df.index.name = 'Date'
+        return df
+
+    def profile(self, symbol):
+        data = http.get(f"{self.BASE_URL}/v3/reference/tickers/{symbol.upper()}?apiKey={self.api_key}").json()
+        if data.get('status') != "OK" or 'results' not in data:
+            raise ProviderError(f"polygon has no profile for {symbol}")
+        return {'name': data['results'].get('name'), 'description': data['results'].get('description')}
+
+    def logo(self, symbol, company_name):
+        data = http.get(f"{self.BASE_URL}/v3/reference/tickers/{symbol.upper()}?apiKey={self.api_key}").json()
+        logo_url = (data.get('results') or {}).get('branding', {}).get('logo_url')
+        return f"{logo_url}?apiKey={self.api_key}" if logo_url else None
+
+
+class KnowledgeGraphProvider(Provider):
+    """Google Knowledge Graph search, keyed by GOOGLE_API_KEY; logos only"""
+
+    name = "knowledge_graph"
+
+    def __init__(self, api_key=None):
+        self.api_key = api_key or os.environ.get("GOOGLE_API_KEY")
+
+    def logo(self, symbol, company_name):
+        url = f'https://kgsearch.googleapis.com/v1/entities:search?query={company_name}&key={self.api_key}&limit=1&indent=True'
+        items = http.get(url).json().get('itemListElement') or []
+        if items and 'image' in items[0]['result']:
+            return items[0]['result']['image']['contentUrl']
+        return None
+
+
+class LocalProvider(Provider):
+    """Reads everything from files under LOCAL_DATA_DIR, never touching the network.
+
+    Bars live in <root>/<interval>/<SYMBOL>.csv (or .parquet) indexed by date
+    with OHLCV_COLUMNS; profiles in <root>/profiles.json as
+    {"SYMBOL": {"name", "description", "logo"}}.
+    """
+
+    name = "local"
+
+    def __init__(self, root=LOCAL_DATA_DIR):
+        self.root = root
+        self._profiles = None
+
+    def history(self, symbol, start, end, interval="1d"):
+        base = os.path.join(self.root, interval, symbol.upper())
+        if os.path.exists(base + ".parquet"):
+            df = pd.read_parquet(base + ".parquet")
+        elif os.path.exists(base + ".csv"):
+            df = pd.read_csv(base + ".csv", index_col=0, parse_dates=True)
+        else:
+            raise ProviderError(f"no local {interval} bars for {symbol}")
+        df.index.name = 'Date'
+        return df[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))]
+
+    def profile(self, symbol):
+        return self._load_profiles().get(symbol.upper())
+
+    def logo(self, symbol, company_name):
+        return (self._load_profiles().get(symbol.upper()) or {}).get('logo')
+
+    def _load_profiles(self):
+        if self._profiles is None:
+            try:
+                with open(os.path.join(self.root, "profiles.json")) as f:
+                    self._profiles = {key.upper(): value for key, value in json.load(f).items()}
+            except (OSError, ValueError):
+                self._profiles = {}
+        return self._profiles
+
+
+class SyntheticProvider(Provider):
+    """Deterministic random-walk bars and placeholder profiles for any symbol.
+
+    Daily closes walk from SYNTHETIC_EPOCH with a seed derived from the
+    symbol; intraday bars walk from the previous daily close with a seed per
+    day. Any range therefore always gets the same bars, which makes this a
+    stable, network-free stand-in for load tests and benchmarks.
+    """
+
+    name = "synthetic"
+    SYNTHETIC_EPOCH = pd.Timestamp("2000-01-03")
+    INTRADAY_MINUTES = {"1m": 1, "5m": 5, "15m": 15, "1h": 60}
+
+    def history(self, symbol, start, end, interval="1d"):
+        if interval != "1d" and interval not in self.INTRADAY_MINUTES:
+            raise ProviderError(f"synthetic has no {interval} bars")
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        seed = zlib.crc32(symbol.upper().encode())
+        days = pd.bdate_range(self.SYNTHETIC_EPOCH, end.normalize() + pd.Timedelta(days=1))
+        closes = 50 * np.exp(np.cumsum(np.random.default_rng([seed, 0]).normal(0.0002, 0.015, len(days))))
+
+        if interval == "1d":
+            df = self._bars(pd.Series(closes, index=days), np.random.default_rng([seed, 1]))
+        else:
+            step = self.INTRADAY_MINUTES[interval]
+            frames = []
+            for i in np.flatnonzero((days >= start.normalize()) & (days < end) & (days > self.SYNTHETIC_EPOCH)):
+                rng = np.random.default_rng([seed, 2, step, days[i].toordinal()])
+                index = pd.date_range(days[i] + pd.Timedelta(hours=9, minutes=30), days[i] + pd.Timedelta(hours=16),
+                                      freq=f"{step}min", inclusive='left')
+                walk = closes[i - 1] * np.exp(np.cumsum(rng.normal(0, 0.015 / np.sqrt(len(index)), len(index))))
+                frames.append(self._bars(pd.Series(walk, index=index), rng))
+            df = pd.concat(frames) if frames else pd.DataFrame(columns=OHLCV_COLUMNS)
+        df.index.name = 'Date'
+        return df[(df.index >= start) & (df.index < end)]
+
+    @staticmethod
+    def _bars(close, rng):
+        # One (n, 2) draw, so bar i gets the same noise however many bars are generated.
+        noise = rng.uniform(0, 1, (len(close), 2))
+        spread = close * noise[:, 0] * 0.01
+        return pd.DataFrame({'Open': close - spread / 2, 'High': close + spread, 'Low': close - spread,
+                             'Close': close, 'Adj Close': close,
+                             'Volume': np.floor(100_000 + noise[:, 1] * 9_900_000)})
+
+    def profile(self, symbol):
+        return {'name': f"{symbol.upper()} Synthetic Corp.",
+                'description': f"Deterministic stand-in data for {symbol.upper()}."}
+
+    def logo(self, symbol, company_name):
+        return "/assets/logo.ico"
+
+
+PROVIDERS = {provider.name: provider for provider in (
+    YFinanceProvider, FMPProvider, PolygonProvider, KnowledgeGraphProvider, LocalProvider, SyntheticProvider)}
+
+
+def provider_chain(names):
+    """Builds providers from a comma-separated list of names such as "local,yfinance" """
+    if isinstance(names, str):
+        names = names.split(",")
+    names = [name.strip() for name in names if name.strip()]
+    unknown = [name for name in names if name not in PROVIDERS]
+    if unknown:
+        raise ValueError(f"unknown providers {unknown}, expected some of {sorted(PROVIDERS)}")
+    return [PROVIDERS[name]() for name in names]
+
+
+class MarketData:
+    """Ordered provider chains for history, profiles and logos; each call falls through to the next provider on failure"""
+
+    def __init__(self, history, profile, logo):
+        self.history_providers = provider_chain(history)
+        self.profile_providers = provider_chain(profile)
+        self.logo_providers = provider_chain(logo)
+
+    @classmethod
+    def from_env(cls, history="yfinance", profile="yfinance", logo="knowledge_graph"):
+        """Chains from HISTORY_PROVIDERS / PROFILE_PROVIDERS / LOGO_PROVIDERS, falling back to
+        DATA_PROVIDERS and then to the given defaults (DATA_PROVIDERS=local,synthetic runs offline)"""
+        shared = os.environ.get("DATA_PROVIDERS")
+        return cls(
+            os.environ.get("HISTORY_PROVIDERS", shared or history),
+            os.environ.get("PROFILE_PROVIDERS", shared or profile),
+            os.environ.get("LOGO_PROVIDERS", shared or logo),
+        )
+
+    def history(self, symbol, start, end, interval="1d"):
+        """Bars from the first provider that has any, or an empty frame"""
+        for provider in self.history_providers:
+            try:
+                df = provider.history(symbol, start, end, interval)
+            except (ProviderError, requests.RequestException, ValueError) as e:
+                log.warning("%s history failed for %s : %s", provider.name, symbol, redact(e), extra={'provider': provider.name, 'symbol': symbol})
+                continue
+            if df is not None and not df.empty:
+                return df
+        return pd.DataFrame()
+
+    def history_many(self, symbols, start, end, interval="1d"):
+        """{symbol: bars}; symbols a provider misses are asked of the next one"""
+        frames = {}
+        for provider in self.history_providers:
+            missing = [symbol for symbol in symbols if symbol not in frames]
+            if not missing:
+                break
+            try:
+                frames.update(provider.history_many(missing, start, end, interval))
+            except (ProviderError, requests.RequestException, ValueError) as e:
+                log.warning("%s bulk history failed : %s", provider.name, redact(e), extra={'provider': provider.name})
+        return frames
+
+    def profile(self, symbol):
+        """{"name", "description"}, each field taken from the first provider that has it"""
+        profile = {'name': None, 'description': None}
+        for provider in self.profile_providers:
+            try:
+                found = provider.profile(symbol) or {}
+            except (ProviderError, requests.RequestException, ValueError, KeyError) as e:
+                log.warning("%s profile failed for %s : %s", provider.name, symbol, redact(e), extra={'provider': provider.name, 'symbol': symbol})
+                continue
+            for field in profile:
+                profile[field] = profile[field] or found.get(field)
+            if all(profile.values()):
+                break
+        return profile
+
+    def logo(self, symbol, company_name):
+        """The first logo URL a provider finds, or None"""
+        for provider in self.logo_providers:
+            try:
+                url = provider.logo(symbol, company_name)
+            except (ProviderError, requests.RequestException, ValueError, KeyError) as e:
+                log.warning("%s logo failed for %s : %s", provider.name, symbol, redact(e), extra={'provider': provider.name, 'symbol': symbol})
+                continue
+            if url:
+                return url
+        return None
+
+
+market_data = MarketData.from_env()
@@ -0,0 +1,150 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from downsample import MAX_CHART_POINTS
+from price_cache import price_cache, price_store
+
+# Intraday levels of the pyramid, finest first, in minutes per bar.
+INTRADAY_MINUTES = {"1m": 1, "5m": 5, "15m": 15, "1h": 60}
+INTERVAL_OPTIONS = [{'label': interval, 'value': interval} for interval in [*INTRADAY_MINUTES, "1d"]]
+DEFAULT_INTERVAL = "1d"
+# Regular US session; only used to estimate how many bars a window holds.
+SESSION_MINUTES = 390
+# Sessions open on the quarter hour (09:30 New York, 08:00 London, 09:15 Mumbai, ...).
+SESSION_ALIGN_MINUTES = 15
+PYRAMID_CACHE_SIZE = int(os.environ.get("PYRAMID_CACHE_SIZE", 128))
+
+
+def session_open(df):
+    """The session open as a minute of the day: the most common time of each day's first bar, floored
+    to the quarter hour, so a day that starts late (a halt, a missing first bar) does not move it"""
+    ts = df.index.values.astype('datetime64[m]').astype(np.int64)
+    if not len(ts):
+        return 0
+    day = ts // 1440
+    firsts = ts[np.r_[True, day[1:] != day[:-1]]] % 1440
+    opens, counts = np.unique(firsts - firsts % SESSION_ALIGN_MINUTES, return_counts=True)
+    return int(opens[np.argmax(counts)])
+
+
+def resample_ohlcv(df, minutes, open_minute=None):
+    """Aggregates intraday OHLCV bars into `minutes`-wide bars in one vectorized pass.
+
+    Bins are anchored at the session open (open_minute, by default
+    session_open(df)) rather than at the top of the hour, which is how
+    yfinance labels coarse intraday bars: US hourly bars start at 09:30,
+    10:30, ... even on a day whose first bar comes later. Open is the first
+    bar's open, High the max, Low the min, Close and Adj Close the last
+    bar's, and Volume the sum. df must be sorted by its naive local-time index.
+    """
+    df = df.dropna(subset=['Open', 'High', 'Low', 'Close'])
+    if df.empty:
+        return df
+    if open_minute is None:
+        open_minute = session_open(df)
+    ts = df.index.values.astype('datetime64[m]').astype(np.int64)
+    anchor = ts // 1440 * 1440 + open_minute
+    bins = anchor + (ts - anchor) // minutes * minutes
+
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    lasts = np.r_[starts[1:], len(ts)] - 1
+    columns = {
+        'Open': df['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(df['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(df['Low'].to_numpy(), starts),
+        'Close': df['Close'].to_numpy()[lasts],
+    }
+    if 'Adj Close' in df:
+        columns['Adj Close'] = df['Adj Close'].to_numpy()[lasts]
+    if 'Volume' in df:
+        columns['Volume'] = np.add.reduceat(df['Volume'].to_numpy(), starts)
+    index = pd.DatetimeIndex(bins[starts].astype('datetime64[m]').astype('datetime64[ns]'), name=df.index.name)
+    return pd.DataFrame(columns, index=index)
+
+
+def display_interval(interval, start, end, max_points=MAX_CHART_POINTS):
+    """The finest level at or above interval whose bars over [start, end) fit in max_points.
+
+    Zoomed-out intraday views step up the pyramid instead of shipping raw
+    minute bars; LTTB downsampling handles whatever is still too long at 1h.
+    """
+    if interval not in INTRADAY_MINUTES:
+        return interval
+    days = max(len(pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(microseconds=1))), 1)
+    levels = [level for level, minutes in INTRADAY_MINUTES.items() if minutes >= INTRADAY_MINUTES[interval]]
+    for level in levels:
+        if days * SESSION_MINUTES / INTRADAY_MINUTES[level] <= max_points:
+            return level
+    return levels[-1]
+
+
+class BarPyramid:
+    """Multi-resolution view of each symbol's intraday bars.
+
+    Only the finest interval already in the price store is ever fetched for
+    a range; coarser intervals are resampled from it on demand and cached
+    per (symbol, base, level). Each level is built from the next finer
+    cached level (1h from 15m rather than from 1m, since the bins nest) and
+    is rebuilt only when the base entry in the price cache changes. Daily
+    bars are not part of the pyramid: their volume and adjusted close come
+    from a different feed, so they are always fetched as 1d.
+    """
+
+    def __init__(self, cache=price_cache, store=price_store, max_entries=PYRAMID_CACHE_SIZE):
+        self.cache = cache
+        self.store = store
+        self.max_entries = max_entries
+        self._levels = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, symbol, start, end, interval="1d"):
+        """Returns bars for symbol in [start, end) at interval, resampling finer stored bars when it can"""
+        if interval not in INTRADAY_MINUTES:
+            return self.cache.get(symbol, start, end, interval)
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        base = self._base(symbol, start, end, interval)
+        df = self.cache.get(symbol, start, end, base)
+        if base == interval or df.empty:
+            return df
+        level = self._level(symbol.strip().upper(), base, interval)
+        if level is None:
+            return resample_ohlcv(df, INTRADAY_MINUTES[interval])
+        return level[(level.index >= start) & (level.index < end)].copy()
+
+    def _base(self, symbol, start, end, interval):
+        for base, minutes in INTRADAY_MINUTES.items():
+            if minutes > INTRADAY_MINUTES[interval]:
+                break
+            if INTRADAY_MINUTES[interval] % minutes == 0 and self.store.covers(symbol, base, start, end):
+                return base
+        return interval
+
+    def _level(self, symbol, base, interval):
+        entry = self.cache.entry(symbol, base)
+        if entry is None:
+            return None
+        key = (symbol, base, interval)
+        with self._lock:
+            cached = self._levels.get(key)
+            if cached is not None and cached[0] is entry:
+                self._levels.move_to_end(key)
+                return cached[1]
+
+        finer = [level for level, minutes in INTRADAY_MINUTES.items()
+                 if INTRADAY_MINUTES[base] < minutes < INTRADAY_MINUTES[interval] and INTRADAY_MINUTES[interval] % minutes == 0]
+        source = self._level(symbol, base, finer[-1]) if finer else entry.df
+        df = resample_ohlcv(source, INTRADAY_MINUTES[interval], session_open(entry.df))
+
+        with self._lock:
+            self._levels[key] = (entry, df)
+            self._levels.move_to_end(key)
+            while len(self._levels) > self.max_entries:
+                self._levels.popitem(last=False)
+        return df
+
+
+bar_pyramid = BarPyramid()
@@ -0,0 +1,121 @@
+import os
+import re
+import logging
+
+import numpy as np
+import pandas as pd
+
+# Symbol,Name CSV, or a pipe-delimited NASDAQ Trader listing (nasdaqtraded.txt) for the full US market.
+SYMBOL_LISTING = os.environ.get("SYMBOL_LISTING", os.path.join(os.path.dirname(__file__), "data", "symbols.csv"))
+# "1" rejects symbols missing from the listing before any upstream call, "0" never does. A listing
+# that fails to load leaves the index empty and lenient, so lookups still reach the providers.
+SYMBOL_INDEX_STRICT = os.environ.get("SYMBOL_INDEX_STRICT", "1")
+# What a typed symbol may look like when it is offered without being in the listing.
+SYMBOL_PATTERN = re.compile(r"^[A-Z0-9.\-^=]{1,12}$")
+MAX_SUGGESTIONS = int(os.environ.get("MAX_SUGGESTIONS", 10))
+log = logging.getLogger(__name__)
+
+
+def load_listing(path):
+    """Reads a listing file into a Symbol / Name frame, sorted and de-duplicated by symbol"""
+    if path.endswith(".txt"):
+        df = pd.read_csv(path, sep="|", dtype=str).rename(columns={"Security Name": "Name"})
+    else:
+        df = pd.read_csv(path, dtype=str)
+    df = df.dropna(subset=["Symbol", "Name"])
+    df["Symbol"] = df["Symbol"].str.strip().str.upper()
+    return df[["Symbol", "Name"]].drop_duplicates("Symbol").sort_values("Symbol", ignore_index=True)
+
+
+def deletions(word):
+    """The word with each single character removed"""
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+class SymbolIndex:
+    """In-memory symbol and company-name index backing the ticker autocomplete.
+
+    Symbols and lower-cased name words are kept in sorted fixed-width NumPy
+    string arrays, so a prefix lookup is two binary searches rather than a
+    scan. Typos are caught with symmetric deletes: every symbol is indexed
+    under each of its one-character deletions, so a query one edit (or one
+    transposition) away from a symbol shares a key with it and is found
+    with a handful of dict lookups.
+    """
+
+    def __init__(self, path=SYMBOL_LISTING, strict=SYMBOL_INDEX_STRICT):
+        try:
+            listing = load_listing(path)
+        except (OSError, ValueError, KeyError) as e:
+            log.warning("Symbol listing %s could not be loaded : %s", path, e)
+            listing = pd.DataFrame({"Symbol": [], "Name": []}, dtype=str)
+
+        self.symbols = listing["Symbol"].to_numpy(dtype=str)
+        self.names = listing["Name"].to_numpy(dtype=str)
+        self._lengths = np.char.str_len(self.symbols) if len(self.symbols) else np.array([], dtype=int)
+        self._positions = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.strict = strict != "0" and len(self.symbols) > 0
+
+        words = [(word, i) for i, name in enumerate(self.names) for word in set(re.findall(r"[a-z0-9]+", name.lower()))]
+        words.sort()
+        self._words = np.array([word for word, _ in words], dtype=str)
+        self._word_ids = np.array([i for _, i in words], dtype=np.int32)
+
+        self._deletes = {}
+        for i, symbol in enumerate(self.symbols):
+            for key in deletions(symbol) | {symbol}:
+                self._deletes.setdefault(key, []).append(i)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return (symbol or "").strip().upper() in self._positions
+
+    def known(self, symbol):
+        """Whether symbol may be looked up upstream: listed, or the index is not strict"""
+        return not self.strict or symbol in self
+
+    def rejection(self, symbol):
+        """The message shown for a symbol known() rejects, or None"""
+        if self.known(symbol):
+            return None
+        return f'"{symbol.strip().upper()}" is not in the symbol listing.'
+
+    def search(self, query, limit=MAX_SUGGESTIONS):
+        """Up to limit (symbol, name) pairs: exact symbol, symbol prefixes, name-word prefixes, then near misses"""
+        query = (query or "").strip()
+        if not query or len(self) == 0:
+            return []
+        upper, lower = query.upper(), query.lower()
+        ids = []
+
+        lo, hi = np.searchsorted(self.symbols, [upper, upper + "\uffff"])
+        if hi > lo:
+            ids.extend(lo + np.argsort(self._lengths[lo:hi], kind="stable")[:limit])
+
+        # Names with a word starting with each query term, in the order of the first term's matches.
+        matches = None
+        for term in re.findall(r"[a-z0-9]+", lower):
+            lo, hi = np.searchsorted(self._words, [term, term + "\uffff"])
+            found = self._word_ids[lo:hi]
+            matches = found if matches is None else matches[np.isin(matches, found)]
+        if matches is not None:
+            ids.extend(matches[:limit])
+
+        if len(upper) > 1:
+            for key in deletions(upper) | {upper}:
+                ids.extend(self._deletes.get(key, ()))
+
+        return [(str(self.symbols[i]), str(self.names[i])) for i in dict.fromkeys(ids)][:limit]
+
+    def options(self, query, limit=MAX_SUGGESTIONS):
+        """search() as dcc.Dropdown options, plus the typed text itself when it is an allowed but unlisted symbol"""
+        options = [{'label': f"{symbol} - {name}", 'value': symbol} for symbol, name in self.search(query, limit)]
+        typed = (query or "").strip().upper()
+        if SYMBOL_PATTERN.match(typed) and typed not in self and self.known(typed):
+            options.append({'label': typed, 'value': typed})
+        return options
+
+
+symbol_index = SymbolIndex()
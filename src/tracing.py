@@ -0,0 +1,248 @@
+import os
+import json
+import time
+import queue
+import atexit
+import random
+import logging
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+import flask
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# Per-logger overrides, e.g. "providers=DEBUG,werkzeug=WARNING".
+LOG_LEVELS = os.environ.get("LOG_LEVELS", "")
+# "json" for one object per line, "text" for a human-readable line.
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")
+# Fraction of callback traces written to the log; slow ones are always written.
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", 0.1))
+SLOW_TRACE_MS = float(os.environ.get("SLOW_TRACE_MS", 1000))
+
+# Attributes every LogRecord has; anything else was passed through `extra` and goes into the JSON.
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+log = logging.getLogger(__name__)
+_current = contextvars.ContextVar("trace", default=None)
+_listener = None
+_setup_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object, with any `extra` fields as top-level keys"""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRS)
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread.
+
+    The stock prepare() renders the message (and any traceback) in the
+    calling thread so the record can be pickled onto a multiprocessing
+    queue. Records here stay in-process, so the caller only pays for
+    building the record and a queue put.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def setup_logging(level=LOG_LEVEL, levels=LOG_LEVELS, fmt=LOG_FORMAT):
+    """Routes all logging through a queue to a background writer on stderr; safe to call more than once"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+        handler = logging.StreamHandler()
+        if fmt == "json":
+            handler.setFormatter(JsonFormatter())
+        else:
+            handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        log_queue = queue.SimpleQueue()
+        _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        root = logging.getLogger()
+        root.handlers[:] = [DeferredQueueHandler(log_queue)]
+        root.setLevel(level)
+        for override in filter(None, (item.strip() for item in levels.split(","))):
+            name, _, value = override.partition("=")
+            logging.getLogger(name.strip()).setLevel(value.strip().upper())
+
+        # Forked children (background callback jobs) inherit the queue handler but not the writer
+        # thread, and exit without running atexit, so they write directly instead. Windows has no
+        # fork, and no register_at_fork.
+        def write_directly():
+            logging.getLogger().handlers[:] = [handler]
+
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=write_directly)
+
+
+class LatencyStats:
+    """Count, total and max milliseconds per (trace, stage) across every trace, sampled or not"""
+
+    def __init__(self):
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, stages):
+        with self._lock:
+            for stage, ms in stages.items():
+                count, total, peak = self._totals.get((name, stage), (0, 0.0, 0.0))
+                self._totals[(name, stage)] = (count + 1, total + ms, max(peak, ms))
+
+    def stats(self):
+        with self._lock:
+            totals = dict(self._totals)
+        result = {}
+        for (name, stage), (count, total, peak) in sorted(totals.items()):
+            result.setdefault(name, {})[stage] = {
+                'count': count, 'mean_ms': round(total / count, 3), 'max_ms': round(peak, 3),
+            }
+        return result
+
+
+latency_stats = LatencyStats()
+
+
+class Trace:
+    """Stage timings for one callback run (validate, fetch, transform, fit, figure, serialize).
+
+    Whether a trace is logged is decided once, up front, by sampling, so an
+    unsampled trace costs a few perf_counter calls; traces slower than
+    SLOW_TRACE_MS are logged regardless. Every trace feeds latency_stats.
+    """
+
+    def __init__(self, name, **fields):
+        self.name = name
+        self.fields = fields
+        self.stages = {}
+        self.outcome = "ok"
+        self.sampled = random.random() < TRACE_SAMPLE_RATE
+        self.started = time.perf_counter()
+        self.total_ms = None
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - started) * 1000
+
+    def finish(self, **stages):
+        """Stops the clock, adding any stages timed elsewhere (in ms), then records and maybe logs the trace"""
+        if self.total_ms is None:
+            self.total_ms = (time.perf_counter() - self.started) * 1000
+        for name, ms in stages.items():
+            self.stages[name] = self.stages.get(name, 0.0) + ms
+        total = self.total_ms + sum(stages.values())
+        latency_stats.add(self.name, {**self.stages, 'total': total})
+        if (self.sampled or total >= SLOW_TRACE_MS) and log.isEnabledFor(logging.INFO):
+            log.info("trace %s %s in %.1f ms", self.name, self.outcome, total, extra={
+                'trace': self.name,
+                'outcome': self.outcome,
+                'total_ms': round(total, 3),
+                'stages': {name: round(ms, 3) for name, ms in self.stages.items()},
+                'sampled': self.sampled,
+                **self.fields,
+            })
+
+
+def current_trace():
+    return _current.get()
+
+
+def annotate(**fields):
+    """Adds fields (symbol, interval, ...) to the current trace's log record; a no-op outside one"""
+    trace = _current.get()
+    if trace is not None:
+        trace.fields.update(fields)
+
+
+@contextmanager
+def stage(name):
+    """Times a block as a stage of the current trace; a no-op outside one"""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    with trace.stage(name):
+        yield
+
+
+def traced(name=None):
+    """Decorator tracing each call of a callback.
+
+    A traced function called from inside another trace (analyze_price
+    calling update_graph) adds to the outer trace rather than starting its
+    own. Inside a Flask request the trace is finished in after_request
+    instead, so the time Dash spends serializing the response is recorded
+    as the "serialize" stage.
+    """
+
+    def decorator(func):
+        trace_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is not None:
+                return func(*args, **kwargs)
+            trace = Trace(trace_name)
+            token = _current.set(trace)
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                trace.outcome = "error"
+                log.exception("%s failed", trace_name, extra={'trace': trace_name})
+                raise
+            finally:
+                _current.reset(token)
+                trace.total_ms = (time.perf_counter() - trace.started) * 1000
+                if trace.outcome == "ok" and flask.has_request_context():
+                    flask.g.setdefault('traces', []).append(trace)
+                else:
+                    trace.finish()
+
+        return wrapper
+
+    return decorator
+
+
+def register_tracing(server):
+    """Finishes request-bound traces with their serialize time and adds GET /stats/latency"""
+
+    @server.before_request
+    def start_request_clock():
+        flask.g.request_started = time.perf_counter()
+
+    @server.after_request
+    def finish_traces(response):
+        traces = flask.g.pop('traces', None)
+        if traces:
+            # Request time outside the callbacks, which is mostly Dash JSON-encoding their outputs.
+            request_ms = (time.perf_counter() - flask.g.request_started) * 1000
+            serialize_ms = max(request_ms - sum(trace.total_ms for trace in traces), 0.0)
+            for trace in traces:
+                trace.fields['response_bytes'] = response.calculate_content_length()
+                trace.finish(serialize=serialize_ms / len(traces))
+        return response
+
+    @server.route("/stats/latency")
+    def latency():
+        return flask.jsonify(latency_stats.stats())
@@ -0,0 +1,91 @@
+import os
+import time
+import logging
+import threading
+
+import pandas as pd
+
+from price_cache import get_history, price_cache
+from profile_cache import profile_cache
+
+# The tickers from the search placeholder and the old dropdown in app-1-slow-api.py.
+WARMUP_SYMBOLS = [s.strip().upper() for s in os.environ.get(
+    "WARMUP_SYMBOLS", "TSLA,MSFT,AAPL,T,GOOGL,META,NVDA,NKE,QCOM,IBM,CCBG"
+).split(",") if s.strip()]
+WARMUP_DAYS = int(os.environ.get("WARMUP_DAYS", 365))
+WARMUP_REFRESH = int(os.environ.get("WARMUP_REFRESH", 15 * 60))
+log = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Background prefetch of popular tickers' history, profile and logo.
+
+    Runs once right after start() and then every `refresh` seconds, which by
+    default matches the price cache TTL so the warm tickers' latest bars are
+    refetched before a user would have to. Warm-up lookups are not counted
+    as cache hits, so stats() shows how often real requests for the warm
+    tickers were served without a cold fetch.
+    """
+
+    def __init__(self, symbols=WARMUP_SYMBOLS, days=WARMUP_DAYS, refresh=WARMUP_REFRESH):
+        self.symbols = symbols
+        self.days = days
+        self.refresh = refresh
+        self.runs = 0
+        self.last_run = None
+        self.last_duration = None
+        self.failures = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, profile_loader):
+        """Starts the scheduler thread; profile_loader is the app's symbol -> profile function"""
+        if self._thread is not None or not self.symbols:
+            return
+        self._thread = threading.Thread(target=self._loop, args=(profile_loader,), name="warmup", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self, profile_loader):
+        """Prefetches every warm symbol once"""
+        started = time.time()
+        end = pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+        start = end - pd.Timedelta(days=self.days)
+        for symbol in self.symbols:
+            if self._stop.is_set():
+                break
+            try:
+                get_history(symbol, start, end, track=False)
+                profile_cache.get(symbol, profile_loader, track=False)
+            except Exception as e:
+                self.failures += 1
+                log.warning("Warm-up failed for %s : %s", symbol, e, extra={'symbol': symbol})
+        self.runs += 1
+        self.last_run = started
+        self.last_duration = time.time() - started
+        log.info("Warm-up of %d symbols took %.1fs", len(self.symbols), self.last_duration,
+                 extra={'symbols': len(self.symbols), 'duration_ms': round(self.last_duration * 1000, 1)})
+
+    def stats(self):
+        return {
+            'symbols': self.symbols,
+            'runs': self.runs,
+            'last_run': self.last_run,
+            'last_duration': self.last_duration,
+            'failures': self.failures,
+            'history': price_cache.stats(self.symbols),
+            'profile': profile_cache.stats(self.symbols),
+            # All symbols, for comparing warm tickers against the rest.
+            'history_all': price_cache.stats(),
+            'profile_all': profile_cache.stats(),
+        }
+
+    def _loop(self, profile_loader):
+        while not self._stop.is_set():
+            self.run_once(profile_loader)
+            self._stop.wait(self.refresh)
+
+
+warmup = Warmup()
@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+# The app modules read their configuration at import time, so it is set before any test imports them.
+_scratch = tempfile.mkdtemp(prefix="stocksense-tests-")
+for name in ("PRICE_STORE_DIR", "JOB_CACHE_DIR", "MODEL_CACHE_DIR", "LOGO_CACHE_DIR"):
+    os.environ.setdefault(name, os.path.join(_scratch, name.lower()))
+os.environ.setdefault("DATA_PROVIDERS", "synthetic")
+os.environ.setdefault("WARMUP_SYMBOLS", "")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
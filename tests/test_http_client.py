@@ -0,0 +1,98 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from http_client import HttpClient, CircuitOpenError
+
+
+class StubServer:
+    """Local HTTP server answering each path from a list of (status, delay) replies, the last one repeating"""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.hits = {}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                replies = stub.routes[self.path]
+                count = stub.hits.get(self.path, 0)
+                stub.hits[self.path] = count + 1
+                status, delay = replies[min(count, len(replies) - 1)]
+                time.sleep(delay)
+                body = b"ok"
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubServer({
+        "/flaky": [(503, 0), (503, 0), (200, 0)],
+        "/slow": [(200, 1.0)],
+        "/down": [(500, 0)],
+        "/missing": [(404, 0)],
+    })
+    yield server
+    server.close()
+
+
+def client(**kwargs):
+    return HttpClient(**{'connect_timeout': 1, 'read_timeout': 0.3, 'backoff': 0.01, **kwargs})
+
+
+def test_flaky_503s_are_retried(stub):
+    response = client(max_retries=2).get(stub.url + "/flaky")
+
+    assert response.status_code == 200
+    assert stub.hits["/flaky"] == 3
+
+
+def test_client_errors_are_returned_without_retrying(stub):
+    response = client(max_retries=2).get(stub.url + "/missing")
+
+    assert response.status_code == 404
+    assert stub.hits["/missing"] == 1
+
+
+def test_slow_endpoint_times_out(stub):
+    with pytest.raises(requests.Timeout):
+        client(max_retries=0).get(stub.url + "/slow")
+
+
+def test_repeated_failures_open_the_circuit(stub):
+    http = client(max_retries=0, failure_threshold=3, reset_after=60)
+    for _ in range(3):
+        assert http.get(stub.url + "/down").status_code == 500
+
+    with pytest.raises(CircuitOpenError):
+        http.get(stub.url + "/down")
+    assert stub.hits["/down"] == 3
+
+
+def test_circuit_lets_a_trial_request_through_after_reset(stub):
+    http = client(max_retries=0, failure_threshold=1, reset_after=0.1)
+    http.get(stub.url + "/down")
+    with pytest.raises(CircuitOpenError):
+        http.get(stub.url + "/missing")
+
+    time.sleep(0.15)
+
+    assert http.get(stub.url + "/missing").status_code == 404
+    assert http.get(stub.url + "/missing").status_code == 404
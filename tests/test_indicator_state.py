@@ -0,0 +1,87 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicator_engine
+from indicators import INDICATOR_OPTIONS, compute, ohlcv_arrays
+from indicator_engine import IndicatorEngine
+from indicator_state import IndicatorStream
+from providers import SyntheticProvider
+
+SPECS = [option['value'] for option in INDICATOR_OPTIONS] + ['sma:1', 'bbands:5:1.5']
+
+
+@pytest.fixture(scope="module")
+def bars():
+    df = SyntheticProvider().history("STREAM", "2015-01-01", "2020-01-01")
+    return df.rename_axis('Date').reset_index()
+
+
+def batch(df, spec):
+    return compute(ohlcv_arrays(df), spec)
+
+
+def assert_matches(actual, expected):
+    assert actual.keys() == expected.keys()
+    for name, values in expected.items():
+        np.testing.assert_allclose(actual[name], values, rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=name)
+
+
+@pytest.mark.parametrize("spec", SPECS)
+def test_streaming_every_bar_matches_batch(spec, bars):
+    arrays, timestamps = ohlcv_arrays(bars), bars['Date'].to_numpy()
+    stream = IndicatorStream(spec)
+    rows = [stream.advance(timestamps[i], {name: float(values[i]) for name, values in arrays.items()})
+            for i in range(len(bars))]
+
+    streamed = {name: np.array([row[name] for row in rows]) for name in rows[0]}
+    assert_matches(streamed, batch(bars, spec))
+
+
+@pytest.mark.parametrize("spec", SPECS)
+def test_replacing_the_last_bar_matches_batch(spec, bars):
+    arrays, timestamps = ohlcv_arrays(bars), bars['Date'].to_numpy()
+    stream = IndicatorStream(spec)
+    stream.seed({name: values[:-1] for name, values in arrays.items()}, timestamps[:-1])
+    # Today's bar arrives twice, moving before the close; the second one replaces the first.
+    stream.advance(timestamps[-1], {name: float(values[-1]) * 1.01 for name, values in arrays.items()})
+    row = stream.advance(timestamps[-1], {name: float(values[-1]) for name, values in arrays.items()})
+
+    assert_matches({name: np.array([value]) for name, value in row.items()},
+                   {name: values[-1:] for name, values in batch(bars, spec).items()})
+
+
+@pytest.mark.parametrize("spec", SPECS)
+def test_engine_extends_and_restores_to_batch(spec, bars, tmp_path, monkeypatch):
+    monkeypatch.setattr(indicator_engine, "checkpoint_path", lambda symbol, interval: str(tmp_path / f"{symbol}.pkl"))
+    start = str(bars['Date'].iloc[0])
+    engine = IndicatorEngine()
+    engine.compute("STREAM", start, "a", bars.iloc[:-5], [spec])
+    extended = engine.compute("STREAM", start, "b", bars, [spec])
+    assert_matches(extended, batch(bars, spec))
+
+    engine.flush()
+    restored = IndicatorEngine()
+    assert_matches(restored.compute("STREAM", start, "c", bars, [spec]), batch(bars, spec))
+    appended = restored.compute("STREAM", start, "d", pd.concat([bars, bars.iloc[-1:].assign(Date=bars['Date'].iloc[-1] + pd.Timedelta(days=1))]), [spec])
+    assert len(next(iter(appended.values()))) == len(bars) + 1
+
+
+def test_restore_is_not_slower_than_batch(bars, tmp_path, monkeypatch):
+    monkeypatch.setattr(indicator_engine, "checkpoint_path", lambda symbol, interval: str(tmp_path / f"{symbol}.pkl"))
+    start = str(bars['Date'].iloc[0])
+    engine = IndicatorEngine()
+    engine.compute("STREAM", start, "a", bars, SPECS)
+    engine.flush()
+
+    started = time.perf_counter()
+    IndicatorEngine().compute("STREAM", start, "b", bars, SPECS)
+    restore_s = time.perf_counter() - started
+    started = time.perf_counter()
+    for spec in SPECS:
+        batch(bars, spec)
+    batch_s = time.perf_counter() - started
+
+    assert restore_s < batch_s * 5 + 0.05
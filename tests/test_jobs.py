@@ -0,0 +1,43 @@
+import time
+
+import pytest
+
+import jobs
+from jobs import claim_forecast_slot, release_forecast_slot
+
+
+@pytest.fixture(autouse=True)
+def two_slots(monkeypatch):
+    monkeypatch.setattr(jobs, "MAX_FORECAST_JOBS", 2)
+    jobs.job_cache.delete(jobs._SLOTS_KEY)
+    yield
+    jobs.job_cache.delete(jobs._SLOTS_KEY)
+
+
+def test_slots_are_limited_and_released():
+    first, second = claim_forecast_slot(), claim_forecast_slot()
+
+    assert first and second and first != second
+    assert claim_forecast_slot() is None
+
+    release_forecast_slot(first)
+    assert claim_forecast_slot() is not None
+
+
+def test_releasing_twice_or_an_unknown_slot_is_harmless():
+    slot = claim_forecast_slot()
+    release_forecast_slot(slot)
+    release_forecast_slot(slot)
+    release_forecast_slot("never-claimed")
+
+    assert claim_forecast_slot() and claim_forecast_slot()
+
+
+def test_slots_of_dead_jobs_expire(monkeypatch):
+    monkeypatch.setattr(jobs, "FORECAST_JOB_TIMEOUT", 0.1)
+    claim_forecast_slot(), claim_forecast_slot()
+    assert claim_forecast_slot() is None
+
+    time.sleep(0.15)
+
+    assert claim_forecast_slot() is not None
@@ -0,0 +1,64 @@
+import io
+
+import pytest
+import requests
+from PIL import Image
+
+import logo_cache
+from profile_cache import ProfileCache, Uncached
+
+
+def png(color):
+    out = io.BytesIO()
+    Image.new("RGB", (256, 256), color).save(out, format="PNG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def downloads(tmp_path, monkeypatch):
+    """Serves logos from a {url: bytes} dict; a missing URL fails like a dropped connection"""
+    images = {}
+
+    def download(url):
+        if url not in images:
+            raise requests.ConnectionError(url)
+        return images[url]
+
+    monkeypatch.setattr(logo_cache, "LOGO_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(logo_cache, "_download", download)
+    monkeypatch.setattr(logo_cache, "_local_urls", logo_cache.OrderedDict())
+    return images
+
+
+def test_fallback_is_served_locally_once_the_default_is_cached(downloads):
+    assert logo_cache.cache_logo("https://logos.example/a.png?apikey=x") == logo_cache.DEFAULT_LOGO_URL
+    downloads[logo_cache.DEFAULT_LOGO_URL] = png("grey")
+    logo_cache.cache_default_logo()
+    fallback = logo_cache.cache_logo("https://logos.example/a.png?apikey=x")
+    assert fallback.startswith(logo_cache.LOGO_ROUTE)
+    assert logo_cache.is_default_logo(fallback)
+    assert logo_cache.cache_logo(logo_cache.DEFAULT_LOGO_URL) == fallback
+
+
+def test_cached_urls_are_bounded(downloads, monkeypatch):
+    monkeypatch.setattr(logo_cache, "LOGO_URL_CACHE_SIZE", 2)
+    for i in range(4):
+        downloads[f"https://logos.example/{i}.png"] = png((i * 60, 0, 0))
+        local = logo_cache.cache_logo(f"https://logos.example/{i}.png")
+        assert local.startswith(logo_cache.LOGO_ROUTE) and not logo_cache.is_default_logo(local)
+    assert list(logo_cache._local_urls) == ["https://logos.example/2.png", "https://logos.example/3.png"]
+
+
+def test_uncached_profiles_are_loaded_again():
+    cache = ProfileCache()
+    loads = []
+
+    def loader(symbol):
+        loads.append(symbol)
+        profile = (symbol, logo_cache.DEFAULT_LOGO_URL, "")
+        return Uncached(profile) if len(loads) == 1 else profile
+
+    assert cache.get("AAPL", loader) == ("AAPL", logo_cache.DEFAULT_LOGO_URL, "")
+    cache.get("AAPL", loader)
+    cache.get("AAPL", loader)
+    assert loads == ["AAPL", "AAPL"]
@@ -0,0 +1,91 @@
+import os
+import time
+
+import numpy as np
+from sklearn.linear_model import Ridge
+
+from model_cache import ModelCache
+
+
+def fit_windows(cache, count):
+    rng = np.random.default_rng(0)
+    for _ in range(count):
+        X = rng.normal(size=(50, 5))
+        cache.get_or_fit(Ridge(), X, X.sum(axis=1), 5)
+
+
+def model_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(".joblib"))
+
+
+def test_disk_files_are_capped_by_size(tmp_path):
+    probe = ModelCache(str(tmp_path / "probe"))
+    fit_windows(probe, 1)
+    size = os.path.getsize(os.path.join(probe.directory, model_files(probe.directory)[0]))
+
+    cache = ModelCache(str(tmp_path / "models"), max_bytes=3 * size)
+    fit_windows(cache, 10)
+
+    assert len(model_files(cache.directory)) == 3
+
+
+def test_expired_and_orphaned_files_are_removed(tmp_path):
+    cache = ModelCache(str(tmp_path), max_age=60)
+    fit_windows(cache, 2)
+    old = time.time() - 2 * 60 * 60
+    for name in os.listdir(tmp_path):
+        if name.endswith(".joblib"):
+            os.utime(tmp_path / name, (old, old))
+    orphan = tmp_path / "dead.joblib.0123.tmp"
+    orphan.write_bytes(b"partial")
+    os.utime(orphan, (old, old))
+
+    cache.prune()
+
+    assert model_files(tmp_path) == []
+    assert not orphan.exists()
+
+
+def test_disk_hit_survives_a_restart(tmp_path):
+    fit_windows(ModelCache(str(tmp_path)), 1)
+    cache = ModelCache(str(tmp_path))
+
+    fit_windows(cache, 1)
+
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_unreadable_files_are_refit(tmp_path):
+    fit_windows(ModelCache(str(tmp_path)), 1)
+    name = model_files(tmp_path)[0]
+    path = tmp_path / name
+    data = path.read_bytes()
+
+    for broken in (data[: len(data) // 2], b"not a pickle", b"\x80\x04\x95garbage"):
+        path.write_bytes(broken)
+        cache = ModelCache(str(tmp_path))
+        fit_windows(cache, 1)
+        assert cache.stats()["disk_hits"] == 0
+        assert model_files(tmp_path) == [name]
+        assert path.read_bytes() == data
+
+
+def test_scores_are_cached_with_the_model(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(50, 5))
+    y = X.sum(axis=1)
+    calls = []
+
+    def score(estimator, X, y, horizon):
+        calls.append(horizon)
+        return 0.5
+
+    cache = ModelCache(str(tmp_path))
+    model, scored = cache.get_or_fit(Ridge(), X, y, 5)
+    assert scored is None
+    assert cache.get_or_fit(Ridge(), X, y, 5, score=score)[1] == 0.5
+    assert cache.get_or_fit(Ridge(), X, y, 5, score=score)[1] == 0.5
+    assert ModelCache(str(tmp_path)).get_or_fit(Ridge(), X, y, 5, score=score)[1] == 0.5
+
+    assert calls == [5]
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,113 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from price_cache import PriceCache
+
+
+class CountingDownloader:
+    """Daily bars for any range, recording every bar it hands out"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.served = []
+        self._lock = threading.Lock()
+
+    def __call__(self, symbol, start, end, interval="1d"):
+        time.sleep(self.delay)
+        index = pd.date_range(start, end, freq="D", inclusive="left", name="Date")
+        with self._lock:
+            self.calls.append((symbol, pd.Timestamp(start), pd.Timestamp(end)))
+            self.served.extend((symbol, ts) for ts in index)
+        close = np.arange(len(index), dtype=np.float64) + 100
+        return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close,
+                             'Adj Close': close, 'Volume': 1.0}, index=index)
+
+    def assert_no_bar_fetched_twice(self):
+        assert len(self.served) == len(set(self.served))
+
+
+def test_overlapping_and_widening_ranges_fetch_each_bar_once():
+    downloader = CountingDownloader()
+    cache = PriceCache(downloader=downloader, ttl=3600)
+
+    requests = [
+        ("2020-03-01", "2020-04-01"),
+        ("2020-02-15", "2020-03-15"),
+        ("2020-03-10", "2020-05-01"),
+        ("2020-01-01", "2020-06-01"),
+        ("2020-02-01", "2020-02-20"),
+    ]
+    for start, end in requests:
+        df = cache.get("AAPL", start, end)
+        assert df.index.min() == pd.Timestamp(start)
+        assert df.index.max() == pd.Timestamp(end) - pd.Timedelta(days=1)
+        assert df.index.is_unique
+
+    downloader.assert_no_bar_fetched_twice()
+    assert {ts for _, ts in downloader.served} == set(pd.date_range("2020-01-01", "2020-05-31"))
+
+
+def test_covered_range_is_a_hit_without_a_download():
+    downloader = CountingDownloader()
+    cache = PriceCache(downloader=downloader, ttl=3600)
+    cache.get("MSFT", "2021-01-01", "2021-12-31")
+    calls = len(downloader.calls)
+
+    df = cache.get("msft ", "2021-03-01", "2021-04-01")
+
+    assert len(downloader.calls) == calls
+    assert len(df) == 31
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+
+
+def test_only_the_gap_between_two_ranges_is_fetched():
+    downloader = CountingDownloader()
+    cache = PriceCache(downloader=downloader, ttl=3600)
+    cache.get("IBM", "2019-01-01", "2019-02-01")
+    cache.get("IBM", "2019-03-01", "2019-04-01")
+    downloader.calls.clear()
+
+    cache.get("IBM", "2019-01-01", "2019-04-01")
+
+    assert downloader.calls == [("IBM", pd.Timestamp("2019-02-01"), pd.Timestamp("2019-03-01"))]
+    downloader.assert_no_bar_fetched_twice()
+
+
+def test_stale_entry_refetches_only_the_unsettled_tail():
+    downloader = CountingDownloader()
+    cache = PriceCache(downloader=downloader, ttl=0)
+    today = pd.Timestamp.today().normalize()
+    start, end = today - pd.Timedelta(days=30), today + pd.Timedelta(days=1)
+    cache.get("NVDA", start, end)
+    downloader.calls.clear()
+
+    cache.get("NVDA", start, end)
+
+    assert downloader.calls == [("NVDA", today, end)]
+
+
+def test_concurrent_misses_share_one_download():
+    downloader = CountingDownloader(delay=0.2)
+    cache = PriceCache(downloader=downloader, ttl=3600)
+    threads = [threading.Thread(target=cache.get, args=("TSLA", "2022-01-01", "2022-07-01")) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(downloader.calls) == 1
+    downloader.assert_no_bar_fetched_twice()
+
+
+def test_least_recently_used_symbol_is_evicted():
+    downloader = CountingDownloader()
+    cache = PriceCache(downloader=downloader, max_bytes=1, ttl=3600)
+    cache.get("A", "2020-01-01", "2020-02-01")
+    cache.get("B", "2020-01-01", "2020-02-01")
+
+    assert cache.entry("A") is None
+    assert cache.entry("B") is not None
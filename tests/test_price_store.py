@@ -0,0 +1,54 @@
+import time
+
+import pandas as pd
+
+from price_store import PriceStore, valid_ranges, refreshed_at, missing_ranges, merge_ranges
+from test_price_cache import CountingDownloader
+
+DAY = 24 * 60 * 60
+
+
+def ts(value):
+    return pd.Timestamp(value)
+
+
+def test_missing_and_merged_ranges():
+    ranges = merge_ranges([(ts("2020-03-01"), ts("2020-04-01")), (ts("2020-01-01"), ts("2020-02-01")),
+                           (ts("2020-02-01"), ts("2020-02-15"))])
+
+    assert ranges == [(ts("2020-01-01"), ts("2020-02-15")), (ts("2020-03-01"), ts("2020-04-01"))]
+    assert missing_ranges(ranges, ts("2019-12-01"), ts("2020-05-01")) == [
+        (ts("2019-12-01"), ts("2020-01-01")), (ts("2020-02-15"), ts("2020-03-01")), (ts("2020-04-01"), ts("2020-05-01")),
+    ]
+
+
+def test_stale_ranges_are_cut_at_the_settled_day():
+    fetched_at = pd.Timestamp("2024-05-10 15:30").timestamp()
+    ranges = [(ts("2024-04-01"), ts("2024-05-11")), (ts("2024-05-10"), ts("2024-05-12"))]
+
+    assert valid_ranges(ranges, time.time(), ttl=60) == ranges
+    assert valid_ranges(ranges, fetched_at, ttl=60) == [(ts("2024-04-01"), ts("2024-05-10"))]
+
+
+def test_fetch_time_moves_only_when_a_gap_reaches_the_unsettled_tail():
+    fetched_at = pd.Timestamp("2024-05-10 15:30").timestamp()
+    now = fetched_at + DAY
+
+    assert refreshed_at(None, [], now) == now
+    assert refreshed_at(fetched_at, [(ts("2024-01-01"), ts("2024-02-01"))], now) == fetched_at
+    assert refreshed_at(fetched_at, [(ts("2024-05-01"), ts("2024-05-11"))], now) == now
+
+
+def test_store_persists_ranges_and_fetches_only_gaps(tmp_path):
+    downloader = CountingDownloader()
+    store = PriceStore(downloader, root=str(tmp_path), ttl=3600)
+    store.fetch("AAPL", "2021-01-01", "2021-02-01")
+    store.fetch("AAPL", "2021-03-01", "2021-04-01")
+
+    reopened = PriceStore(downloader, root=str(tmp_path), ttl=3600)
+    df = reopened.fetch("AAPL", "2021-01-01", "2021-04-01")
+
+    assert len(df) == 90
+    assert reopened.covers("AAPL", "1d", "2021-01-01", "2021-04-01")
+    downloader.assert_no_bar_fetched_twice()
+    assert downloader.calls[-1] == ("AAPL", ts("2021-02-01"), ts("2021-03-01"))
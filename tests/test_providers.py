@@ -0,0 +1,38 @@
+import logging
+
+import requests
+
+from providers import PROVIDERS, MarketData, Provider
+
+
+class FailingProvider(Provider):
+    name = "failing"
+
+    def history(self, symbol, start, end, interval="1d"):
+        raise requests.ConnectionError(
+            f"Max retries exceeded with url: /api/v3/historical-price-full/{symbol}?from=2024-01-01&apikey=SECRET123 "
+            "(Caused by NameResolutionError)"
+        )
+
+    def history_many(self, symbols, start, end, interval="1d"):
+        return self.history(symbols[0], start, end, interval)
+
+    def profile(self, symbol):
+        raise requests.HTTPError(f"401 Client Error for url: https://api.polygon.io/v3/reference/tickers/{symbol}?apiKey=SECRET123")
+
+    def logo(self, symbol, company_name):
+        return self.profile(symbol)
+
+
+def test_provider_errors_are_logged_without_api_keys(caplog, monkeypatch):
+    monkeypatch.setitem(PROVIDERS, FailingProvider.name, FailingProvider)
+    market_data = MarketData("failing", "failing", "failing")
+    with caplog.at_level(logging.WARNING, logger="providers"):
+        assert market_data.history("AAPL", "2024-01-01", "2024-02-01").empty
+        assert market_data.history_many(["AAPL"], "2024-01-01", "2024-02-01") == {}
+        assert market_data.profile("AAPL") == {'name': None, 'description': None}
+        assert market_data.logo("AAPL", "Apple") is None
+    assert len(caplog.records) == 4
+    assert "SECRET123" not in caplog.text
+    assert "historical-price-full/AAPL" in caplog.text
+    assert "NameResolutionError" in caplog.text
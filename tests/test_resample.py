@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from resample import resample_ohlcv, session_open
+
+
+def minute_bars(days, late=None):
+    """Random 1m bars over regular 09:30-16:00 sessions; day number `late` starts at 09:47 instead"""
+    rng = np.random.default_rng(0)
+    index = []
+    for i, day in enumerate(pd.bdate_range("2024-03-04", periods=days)):
+        start = "09:47" if i == late else "09:30"
+        index.extend(pd.date_range(f"{day:%Y-%m-%d} {start}", f"{day:%Y-%m-%d} 15:59", freq="1min"))
+    index = pd.DatetimeIndex(index, name="Datetime")
+    close = 100 + rng.normal(size=len(index)).cumsum()
+    open_ = close + rng.normal(scale=0.1, size=len(index))
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) + rng.random(len(index)),
+        'Low': np.minimum(open_, close) - rng.random(len(index)),
+        'Close': close,
+        'Adj Close': close,
+        'Volume': rng.integers(100, 10000, len(index)).astype(float),
+    }, index=index)
+
+
+def reference(df, minutes):
+    """Groupby over bins offset from the 09:30 open, as yfinance labels them"""
+    opens = df.index.floor("D") + pd.Timedelta(hours=9, minutes=30)
+    width = pd.Timedelta(minutes=minutes)
+    bins = opens + (df.index - opens) // width * width
+    grouped = df.groupby(bins)
+    out = pd.DataFrame({
+        'Open': grouped['Open'].first(),
+        'High': grouped['High'].max(),
+        'Low': grouped['Low'].min(),
+        'Close': grouped['Close'].last(),
+        'Adj Close': grouped['Adj Close'].last(),
+        'Volume': grouped['Volume'].sum(),
+    })
+    out.index.name = df.index.name
+    return out
+
+
+@pytest.mark.parametrize("minutes", [5, 15, 60])
+def test_ohlcv_aggregation_matches_groupby(minutes):
+    df = minute_bars(3)
+    pd.testing.assert_frame_equal(resample_ohlcv(df, minutes), reference(df, minutes), check_freq=False)
+
+
+def test_late_first_bar_keeps_the_session_grid():
+    df = minute_bars(5, late=2)
+    assert session_open(df) == 570
+    hourly = resample_ohlcv(df, 60)
+    late_day = hourly[hourly.index.normalize() == pd.bdate_range("2024-03-04", periods=5)[2]]
+    assert [f"{t:%H:%M}" for t in late_day.index] == ["09:30", "10:30", "11:30", "12:30", "13:30", "14:30", "15:30"]
+    pd.testing.assert_frame_equal(hourly, reference(df, 60), check_freq=False)
+
+
+def test_coarse_levels_nest():
+    df = minute_bars(3, late=1)
+    open_minute = session_open(df)
+    from_15m = resample_ohlcv(resample_ohlcv(df, 15, open_minute), 60, open_minute)
+    pd.testing.assert_frame_equal(from_15m, resample_ohlcv(df, 60, open_minute))
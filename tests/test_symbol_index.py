@@ -0,0 +1,61 @@
+import itertools
+import string
+import time
+
+import pandas as pd
+import pytest
+
+from symbol_index import SYMBOL_LISTING, SymbolIndex
+
+
+@pytest.fixture(scope="module")
+def listing(tmp_path_factory):
+    """A full-market sized listing: the bundled sample plus about 10,000 made-up symbols"""
+    sample = pd.read_csv(SYMBOL_LISTING, dtype=str)
+    made_up = ["".join(letters) for letters in itertools.product(string.ascii_uppercase, repeat=3)][:10000]
+    df = pd.concat([sample, pd.DataFrame({"Symbol": made_up, "Name": [f"{symbol} Holdings Inc" for symbol in made_up]})])
+    path = tmp_path_factory.mktemp("listing") / "symbols.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_strict_by_default(listing):
+    index = SymbolIndex(listing)
+    assert index.strict
+    assert index.known("aapl") and index.known(" MSFT ")
+    assert not index.known("APPL1")
+    assert index.rejection("APPL1") == '"APPL1" is not in the symbol listing.'
+    assert {'label': "APPL1", 'value': "APPL1"} not in index.options("APPL1")
+
+
+def test_lenient_when_disabled_or_listing_missing(listing, tmp_path):
+    assert SymbolIndex(listing, strict="0").known("BTC-USD")
+    missing = SymbolIndex(str(tmp_path / "missing.csv"))
+    assert not missing.strict and len(missing) == 0
+    assert missing.known("BTC-USD")
+    assert missing.options("BTC-USD") == [{'label': "BTC-USD", 'value': "BTC-USD"}]
+
+
+def test_search(listing):
+    index = SymbolIndex(listing)
+    assert index.search("AAPL")[0][0] == "AAPL"
+    assert index.search("apple")[0][0] == "AAPL"
+    assert "AAPL" in [symbol for symbol, _ in index.search("APPL")]
+    assert "MSFT" in [symbol for symbol, _ in index.search("MSTF")]
+
+
+def test_lookups_take_under_a_millisecond(listing):
+    index = SymbolIndex(listing)
+    queries = ["AAPL", "A", "apple", "micro", "APPL", "MSTF", "QQZ", "ZZZZ"]
+    for query in queries:
+        index.search(query)
+        best = min(_elapsed(index.search, query) for _ in range(20))
+        assert best < 0.001, f"search({query!r}) took {best * 1000:.3f} ms"
+    best = min(_elapsed(index.known, "QQZ") for _ in range(20))
+    assert best < 0.001
+
+
+def _elapsed(func, *args):
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started